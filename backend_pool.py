@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+import urllib.request
+from typing import Callable, Dict, List
+
+import httpx
+
+DEFAULT_HOST = "http://localhost:11434"
+# Latência (segundos) suposta para hosts quando nenhum foi medido ainda
+DEFAULT_LATENCY = 1.0
+
+def hosts_from_env(default: str = DEFAULT_HOST) -> List[str]:
+    """Reads the inference hosts from OLLAMA_HOSTS (comma separated)"""
+    hosts = [host.strip().rstrip("/") for host in os.environ.get("OLLAMA_HOSTS", default).split(",")]
+    return [host for host in hosts if host]
+
+def _ollama_client(host: str):
+    import ollama
+    return ollama.Client(host=host)
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for errors that mean the host itself is unreachable, not a bad request"""
+    if isinstance(error, (ConnectionError, TimeoutError, OSError, httpx.TransportError)):
+        return True
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+def _status_code(error: Exception):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def _is_host_error(error: Exception) -> bool:
+    """True when another host may succeed: unreachable host or a 5xx server error"""
+    if _is_connection_error(error):
+        return True
+    status = _status_code(error)
+    return status is not None and status >= 500
+
+class Backend:
+    """Um endpoint de inferência e suas estatísticas de roteamento"""
+    def __init__(self, host: str, client):
+        self.host = host
+        self.client = client
+        self.outstanding = 0
+        self.latency = None  # média móvel exponencial, em segundos
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+
+    def snapshot(self) -> Dict:
+        return {"host": self.host, "healthy": self.healthy, "outstanding": self.outstanding,
+                "latency": self.latency, "requests": self.requests, "failures": self.failures}
+
+class BackendPool:
+    """
+    Distribui requisições entre vários hosts de inferência.
+    strategy "least_outstanding" escolhe o host com menos requisições em andamento;
+    "latency" pondera as requisições em andamento pela latência média observada.
+    Hosts que falham por conexão são retirados até passarem no health check.
+    """
+    STRATEGIES = ("least_outstanding", "latency")
+
+    def __init__(self, hosts: List[str], client_factory: Callable = None,
+                 strategy: str = "least_outstanding", health_path: str = "/api/tags",
+                 health_interval: float = 10.0, latency_smoothing: float = 0.3):
+        if not hosts:
+            raise ValueError("BackendPool needs at least one host")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown routing strategy '{strategy}', expected one of {', '.join(self.STRATEGIES)}")
+        client_factory = client_factory or _ollama_client
+        self.backends = [Backend(host.rstrip("/"), client_factory(host.rstrip("/"))) for host in hosts]
+        self.strategy = strategy
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.latency_smoothing = latency_smoothing
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    def _latency_prior(self) -> float:
+        # Latência suposta para hosts ainda sem medição: a média dos já medidos
+        measured = [b.latency for b in self.backends if b.latency is not None]
+        return sum(measured) / len(measured) if measured else DEFAULT_LATENCY
+
+    def _score(self, backend: Backend, prior: float):
+        if self.strategy == "latency":
+            # Hosts sem medição usam a latência suposta, para que os pedidos em andamento contem;
+            # no empate, são experimentados primeiro
+            latency = backend.latency if backend.latency is not None else prior
+            return (backend.outstanding + 1) * latency, backend.latency is not None, backend.outstanding
+        return backend.outstanding, backend.latency or 0.0
+
+    def _acquire(self, tried: List[Backend]) -> Backend:
+        with self._lock:
+            candidates = [b for b in self.backends if b not in tried]
+            if not candidates:
+                return None
+            # Se nenhum host está saudável, tenta mesmo assim em vez de falhar direto
+            healthy = [b for b in candidates if b.healthy] or candidates
+            prior = self._latency_prior()
+            backend = min(healthy, key=lambda b: self._score(b, prior))
+            backend.outstanding += 1
+            return backend
+
+    def _release(self, backend: Backend, elapsed: float, error: Exception = None):
+        with self._lock:
+            backend.outstanding -= 1
+            backend.requests += 1
+            if error is None:
+                if backend.latency is None:
+                    backend.latency = elapsed
+                else:
+                    backend.latency += self.latency_smoothing * (elapsed - backend.latency)
+                backend.healthy = True
+            else:
+                backend.failures += 1
+                if _is_connection_error(error):
+                    backend.healthy = False
+
+    def call(self, fn: Callable):
+        """Runs fn(client) on the best backend, failing over to the others when the host is at fault"""
+        tried = []
+        last_error = None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise last_error
+            tried.append(backend)
+            start_time = time.time()
+            try:
+                result = fn(backend.client)
+            except Exception as e:
+                self._release(backend, time.time() - start_time, e)
+                # Erros do pedido (modelo inexistente, 4xx) falhariam em todos os hosts
+                if not _is_host_error(e):
+                    raise
+                last_error = e
+                continue
+            self._release(backend, time.time() - start_time)
+            return result
+
+    def chat(self, model: str, messages: List[Dict]) -> str:
+        """Ollama chat request through the pool, returning the reply text"""
+        return self.call(lambda client: client.chat(model=model, messages=messages).message.content)
+
+    def embeddings(self, model: str, prompt: str) -> List[float]:
+        """Ollama embedding request through the pool"""
+        return self.call(lambda client: client.embeddings(model=model, prompt=prompt)['embedding'])
+
+    def check_health(self, timeout: float = 2.0):
+        """Probes every backend once and updates its healthy flag"""
+        for backend in self.backends:
+            try:
+                with urllib.request.urlopen(backend.host + self.health_path, timeout=timeout) as response:
+                    healthy = 200 <= response.status < 300
+            except Exception:
+                healthy = False
+            with self._lock:
+                backend.healthy = healthy
+
+    def start_health_checks(self):
+        """Starts the periodic health check thread"""
+        if self._health_thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.health_interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name="backend-health", daemon=True)
+        self._health_thread.start()
+
+    def stats(self) -> List[Dict]:
+        """Returns routing statistics for every backend"""
+        with self._lock:
+            return [backend.snapshot() for backend in self.backends]
+
+    def close(self):
+        """Stops the health check thread"""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
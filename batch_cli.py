@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict
+from llm_queue import LLMRequestQueue
+from model_routing import ModelRouter
+from prompt_builder import DEFAULT_TOKEN_BUDGET
+from run_journal import RunJournal, JOURNAL_NAME
+from main_functions import (
+    run_documentation_pipeline,
+    iter_python_files,
+    llm_chat,
+    configure_llm_backends,
+    configure_scheduler,
+    get_backend_pool,
+    log_info,
+    log_warning,
+    log_error,
+    log_success
+)
+
+def read_manifest(manifest_path: str) -> List[str]:
+    """Reads project roots from a manifest: a JSON list or one path per line ('#' starts a comment)"""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if manifest_path.endswith(".json"):
+        return [str(root) for root in json.loads(content)]
+    roots = []
+    for line in content.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            roots.append(line)
+    return roots
+
+def output_dirs_for(project_roots: List[str], output_dir: str = None) -> Dict[str, str]:
+    """Maps each project root to its documentation directory"""
+    output_dirs = {}
+    used_names = set()
+    for root in project_roots:
+        if output_dir is None:
+            output_dirs[root] = os.path.join(root, "project_docs")
+            continue
+        # Projetos com o mesmo nome de pasta recebem um sufixo numérico
+        name = os.path.basename(os.path.normpath(root)) or "project"
+        candidate, suffix = name, 2
+        while candidate in used_names:
+            candidate, suffix = f"{name}_{suffix}", suffix + 1
+        used_names.add(candidate)
+        output_dirs[root] = os.path.join(output_dir, candidate)
+    return output_dirs
+
+def document_project(project_dir: str, output_dir: str, model: str,
+                     llm_queue: LLMRequestQueue, analysis_pool, router: ModelRouter = None,
+                     token_budget: int = DEFAULT_TOKEN_BUDGET, site: bool = False,
+                     resume: bool = False, stop_event: threading.Event = None, open_journals: set = None) -> Dict:
+    """Runs the scan/analyze/summarize/write pipeline for one project, returning its statistics
+
+    Completed analyses and summaries are journaled in output_dir; with resume=True
+    the ones already in the journal are reused instead of recomputed. stop_event
+    cancels the run; while it runs its journal is kept in open_journals.
+    """
+    stats = {"project": project_dir, "output_dir": output_dir, "files": 0, "analyzed": 0,
+             "summaries": 0, "resumed": 0, "ok": False}
+    start_time = time.time()
+    journal = None
+    try:
+        # Um caminho errado no manifesto deve falhar, não gerar documentação vazia
+        if not os.path.isdir(project_dir):
+            raise FileNotFoundError(f"Project directory not found: {project_dir}")
+        if next(iter_python_files(project_dir), None) is None:
+            raise ValueError(f"No Python files found in {project_dir}")
+        journal = RunJournal(os.path.join(output_dir, JOURNAL_NAME), resume=resume)
+        if open_journals is not None:
+            open_journals.add(journal)
+        # Varredura, análise, resumos e escrita se sobrepõem no pipeline
+        pipeline_result = run_documentation_pipeline(
+            project_dir, output_dir, model, llm_queue=llm_queue, router=router, token_budget=token_budget,
+            journal=journal, analysis_pool=analysis_pool, summary_workers=llm_queue.max_concurrency, site=site,
+            stop_event=stop_event
+        )
+        stats["resumed"] = pipeline_result["resumed"]
+        stage_stats = pipeline_result["stages"]
+        stats["files"] = stage_stats["analyze"]["processed"]
+        stats["analyzed"] = len(pipeline_result["analysis_results"])
+        stats["summaries"] = len(pipeline_result["documentation"]["file_summaries"])
+        stats["stages"] = stage_stats
+        stats["ok"] = True
+    except Exception as e:
+        log_error(f"Error documenting {project_dir}: {e}")
+        stats["error"] = str(e)
+    finally:
+        if journal is not None:
+            if open_journals is not None:
+                open_journals.discard(journal)
+            journal.close()
+    stats["seconds"] = time.time() - start_time
+    stats["files_per_second"] = stats["analyzed"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+def print_report(project_stats: List[Dict], aggregate: Dict, router: ModelRouter = None):
+    """Prints per-project and aggregate throughput"""
+    log_info("Per-project throughput")
+    for stats in project_stats:
+        status = "ok" if stats["ok"] else f"FAILED ({stats.get('error', '')})"
+        print(f"  {stats['project']}: {stats['analyzed']}/{stats['files']} files, "
+              f"{stats['summaries']} summaries ({stats['resumed']} resumed), {stats['seconds']:.1f}s, "
+              f"{stats['files_per_second']:.2f} files/s [{status}]")
+    log_info("Aggregate throughput")
+    print(f"  projects: {aggregate['projects_ok']}/{aggregate['projects']} ok")
+    print(f"  files: {aggregate['files']} in {aggregate['seconds']:.1f}s "
+          f"({aggregate['files_per_second']:.2f} files/s)")
+    llm = aggregate["llm"]
+    print(f"  LLM requests: {llm['completed']} completed, {llm['failed']} failed, "
+          f"{llm['fallbacks']} retried with the large model, "
+          f"{llm['requests_per_second']:.2f} req/s, {llm['utilization']:.0%} worker utilization")
+    for backend in llm.get("backends", []):
+        latency = f"{backend['latency']:.2f}s" if backend["latency"] is not None else "n/a"
+        print(f"    {backend['host']}: {backend['requests']} requests, {backend['failures']} failures, "
+              f"avg latency {latency}, {'healthy' if backend['healthy'] else 'UNHEALTHY'}")
+    scheduler = aggregate.get("scheduler")
+    if scheduler is not None:
+        log_info("Request scheduler")
+        for name in ("interactive", "batch"):
+            stats = scheduler[name]
+            print(f"  {name:<11} {stats['completed']} completed, {stats['pending']} pending, "
+                  f"wait avg {stats['wait_avg']:.2f}s, p95 {stats['wait_p95']:.2f}s, max {stats['wait_max']:.2f}s")
+    if router is not None:
+        log_info("Model routing")
+        for line in router.report_lines():
+            print(f"  {line}")
+
+def _ignore_sigint():
+    # Ctrl-C é tratado só pelo processo principal; os workers de análise não morrem no meio
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def run_batch(project_roots: List[str], output_dir: str = None, model: str = "qwen2.5:14b-instruct-q4_K_M",
+              llm_concurrency: int = None, max_pending: int = 32, analysis_workers: int = None,
+              project_workers: int = 4, router: ModelRouter = None,
+              token_budget: int = DEFAULT_TOKEN_BUDGET, site: bool = False, resume: bool = False) -> Dict:
+    """Documents many projects through one shared LLM queue and one shared analysis pool
+
+    llm_concurrency defaults to two batch workers per configured inference host.
+    """
+    start_time = time.time()
+    # O mesmo projeto listado duas vezes é documentado uma vez só
+    project_roots = list(dict.fromkeys(project_roots))
+    output_dirs = output_dirs_for(project_roots, output_dir)
+    log_info(f"Documenting {len(project_roots)} projects")
+    pool = get_backend_pool()
+    host_count = len(pool.backends) if pool is not None else 1
+    if llm_concurrency is None:
+        llm_concurrency = 2 * host_count
+    elif llm_concurrency < host_count:
+        log_warning(f"LLM concurrency {llm_concurrency} is lower than the {host_count} inference hosts; "
+                    f"some hosts will stay idle")
+    # Batch usa llm_concurrency workers; um a mais fica reservado para pedidos interativos
+    scheduler = configure_scheduler(max_concurrency=llm_concurrency + 1, reserved_interactive=1,
+                                    max_pending_batch=max_pending)
+
+    stop_event = threading.Event()
+    open_journals = set()
+    llm_queue = LLMRequestQueue(llm_chat, llm_concurrency, max_pending)
+    analysis_pool = ProcessPoolExecutor(max_workers=analysis_workers, initializer=_ignore_sigint)
+    project_pool = ThreadPoolExecutor(max_workers=project_workers)
+    try:
+        futures = [
+            project_pool.submit(document_project, root, output_dirs[root], model, llm_queue, analysis_pool, router,
+                                token_budget, site, resume, stop_event, open_journals)
+            for root in project_roots
+        ]
+        project_stats = [future.result() for future in futures]
+    except KeyboardInterrupt:
+        # Não espera os projetos em andamento: cancela os pipelines, descarta os projetos
+        # que ainda não começaram e grava os journals no disco antes de sair
+        stop_event.set()
+        project_pool.shutdown(wait=False, cancel_futures=True)
+        analysis_pool.shutdown(wait=False, cancel_futures=True)
+        for journal in list(open_journals):
+            journal.sync()
+        raise
+    project_pool.shutdown()
+    analysis_pool.shutdown()
+    llm_stats = llm_queue.stats()
+    llm_queue.close()
+    if pool is not None:
+        llm_stats["backends"] = pool.stats()
+
+    seconds = time.time() - start_time
+    files = sum(stats["analyzed"] for stats in project_stats)
+    aggregate = {
+        "projects": len(project_stats),
+        "projects_ok": sum(1 for stats in project_stats if stats["ok"]),
+        "files": files,
+        "seconds": seconds,
+        "files_per_second": files / seconds if seconds else 0.0,
+        "llm": llm_stats,
+        "scheduler": scheduler.stats()
+    }
+    if router is not None:
+        aggregate["routing"] = {"policy": router.policy(), "tiers": router.stats()}
+    print_report(project_stats, aggregate, router)
+    return {"projects": project_stats, "aggregate": aggregate}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate documentation for many Python projects in one run")
+    parser.add_argument("projects", nargs="*", help="Project root directories")
+    parser.add_argument("--manifest", help="File listing project roots (JSON list or one path per line)")
+    parser.add_argument("--output-dir", help="Write each project's docs to OUTPUT_DIR/<project name> "
+                                             "instead of <project>/project_docs")
+    parser.add_argument("--model", default="qwen2.5:14b-instruct-q4_K_M", help="Ollama model for summaries")
+    parser.add_argument("--small-model", default="qwen2.5:3b-instruct-q4_K_M",
+                        help="Model for files below the complexity threshold")
+    parser.add_argument("--no-routing", action="store_true",
+                        help="Summarize every file with --model instead of routing by complexity")
+    parser.add_argument("--prompt-tokens", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help="Token budget for the source excerpts in each file prompt")
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="Parallel LLM requests (default: 2 per inference host)")
+    parser.add_argument("--max-pending", type=int, default=32, help="Queued LLM requests before producers block")
+    parser.add_argument("--analysis-workers", type=int, default=None, help="Processes for AST analysis")
+    parser.add_argument("--project-workers", type=int, default=4, help="Projects processed at the same time")
+    parser.add_argument("--hosts", nargs="+", help="Ollama hosts to spread LLM requests across "
+                                                    "(default: OLLAMA_HOSTS or localhost)")
+    parser.add_argument("--routing", choices=["least_outstanding", "latency"], default="least_outstanding",
+                        help="How requests are assigned to hosts")
+    parser.add_argument("--site", action="store_true",
+                        help="Write a multi-page HTML site (one page per module) instead of a single HTML page")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse the analyses and summaries journaled by an interrupted run")
+    parser.add_argument("--stats-json", help="Also write the throughput report to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    project_roots = list(args.projects)
+    if args.manifest:
+        project_roots += read_manifest(args.manifest)
+    if not project_roots:
+        log_error("No projects given; pass project roots or --manifest")
+        return 2
+    if args.hosts:
+        configure_llm_backends(args.hosts, args.routing)
+
+    router = None if args.no_routing else ModelRouter(small_model=args.small_model, large_model=args.model)
+    try:
+        report = run_batch(project_roots, args.output_dir, args.model, args.llm_concurrency,
+                           args.max_pending, args.analysis_workers, args.project_workers, router,
+                           args.prompt_tokens, args.site, args.resume)
+    except KeyboardInterrupt:
+        # run_batch já cancelou os projetos e gravou os journals;
+        # sai direto em vez de esperar as requisições em andamento
+        log_error("Interrupted; run again with --resume to continue")
+        os._exit(130)
+    if args.stats_json:
+        with open(args.stats_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        log_success(f"Throughput report saved to: {args.stats_json}")
+    return 0 if report["aggregate"]["projects_ok"] == report["aggregate"]["projects"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
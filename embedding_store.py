@@ -0,0 +1,173 @@
+import os
+from typing import List, Tuple, Optional
+import numpy as np
+
+# Formatos de armazenamento suportados para os embeddings
+STORAGE_MODES = ("float32", "float16", "int8")
+
+_STORAGE_SUFFIXES = {
+    "float32": ".embedding.npy",
+    "float16": ".embedding.f16.npy",
+    "int8": ".embedding.i8.npy",
+}
+
+# No formato int8 os primeiros bytes do arquivo guardam o fator de escala (float32)
+_SCALE_BYTES = np.dtype(np.float32).itemsize
+
+# Quantidade de linhas convertidas por vez ao pontuar a matriz quantizada
+_SCORE_BLOCK_SIZE = 4096
+
+def _check_storage(storage: str):
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage '{storage}', expected one of {', '.join(STORAGE_MODES)}")
+
+def embedding_path(file_path: str, storage: str = "float32") -> str:
+    """Returns the path where the embedding of a source file is stored"""
+    _check_storage(storage)
+    embedding_dir = os.path.join(os.path.dirname(file_path), '.project_docs')
+    return os.path.join(embedding_dir, f"{os.path.basename(file_path)}{_STORAGE_SUFFIXES[storage]}")
+
+def find_embedding(file_path: str, storage: str = "float32") -> Tuple[Optional[str], Optional[str]]:
+    """Returns (path, storage) of the stored embedding of a source file, preferring the given format"""
+    for mode in (storage,) + tuple(m for m in STORAGE_MODES if m != storage):
+        path = embedding_path(file_path, mode)
+        if os.path.exists(path):
+            return path, mode
+    return None, None
+
+def quantize_embedding(vector, storage: str = "float32") -> Tuple[np.ndarray, float]:
+    """Converts a vector to the storage format, returning the values and their scale factor"""
+    _check_storage(storage)
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    if storage == "float32":
+        return vector, 1.0
+    if storage == "float16":
+        return vector.astype(np.float16), 1.0
+
+    # Quantização escalar simétrica: cada vetor tem seu próprio fator de escala
+    max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+    return quantized, scale
+
+def dequantize_embedding(values: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """Restores a stored vector (or matrix of vectors) to float32"""
+    values = values.astype(np.float32)
+    if np.ndim(scale) == 0:
+        return values * np.float32(scale)
+    return values * np.asarray(scale, dtype=np.float32)[:, None]
+
+def save_embedding(file_path: str, vector, storage: str = "float32") -> str:
+    """Saves the embedding of a source file next to it in the '.project_docs' folder"""
+    path = embedding_path(file_path, storage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    values, scale = quantize_embedding(vector, storage)
+    if storage == "int8":
+        # Um único .npy: a escala vai à frente dos valores, vista como bytes int8
+        values = np.concatenate([np.array([scale], dtype=np.float32).view(np.int8), values])
+    np.save(path, values)
+    return path
+
+def load_embedding(path: str) -> Tuple[np.ndarray, float]:
+    """Loads a stored embedding, returning the raw values and their scale factor"""
+    values = np.load(path).ravel()
+    if path.endswith(_STORAGE_SUFFIXES["int8"]):
+        return values[_SCALE_BYTES:], float(values[:_SCALE_BYTES].view(np.float32)[0])
+    return values, 1.0
+
+class QuantizedEmbeddingIndex:
+    """
+    Matriz de embeddings de um projeto mantida no formato de armazenamento.
+    A busca pontua a matriz quantizada e depois reavalia os melhores candidatos
+    com o vetor de consulta em precisão total.
+    """
+    def __init__(self, storage: str = "float32"):
+        _check_storage(storage)
+        self.storage = storage
+        self.paths: List[str] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.norms: Optional[np.ndarray] = None
+        self.converted = 0
+
+    @classmethod
+    def from_project(cls, project_dir: str, storage: str = "float32") -> "QuantizedEmbeddingIndex":
+        """Loads every stored embedding of the project in the given storage format
+
+        Embeddings stored in another format are converted on load and counted in `converted`.
+        """
+        index = cls(storage)
+        rows, scales = [], []
+        for root, _, files in os.walk(project_dir):
+            for file in files:
+                if file.endswith('.py'):
+                    file_path = os.path.join(root, file)
+                    path, stored_as = find_embedding(file_path, storage)
+                    if path is not None:
+                        values, scale = load_embedding(path)
+                        if stored_as != storage:
+                            values, scale = quantize_embedding(dequantize_embedding(values, scale), storage)
+                            index.converted += 1
+                        index.paths.append(file_path)
+                        rows.append(values)
+                        scales.append(scale)
+        if rows:
+            index.matrix = np.vstack(rows)
+            index.scales = np.asarray(scales, dtype=np.float32)
+            index.norms = np.empty(len(rows), dtype=np.float32)
+            for start in range(0, len(rows), _SCORE_BLOCK_SIZE):
+                block = dequantize_embedding(index.matrix[start:start + _SCORE_BLOCK_SIZE],
+                                             index.scales[start:start + _SCORE_BLOCK_SIZE])
+                index.norms[start:start + _SCORE_BLOCK_SIZE] = np.linalg.norm(block, axis=1)
+            index.norms[index.norms == 0] = 1.0
+        return index
+
+    def __len__(self):
+        return len(self.paths)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored matrix and its scale factors"""
+        if self.matrix is None:
+            return 0
+        return self.matrix.nbytes + self.scales.nbytes + self.norms.nbytes
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine scores computed directly on the quantized matrix"""
+        if self.storage == "int8":
+            # A consulta também é quantizada, então o produto escalar é feito em inteiros
+            query_values, _ = quantize_embedding(query, "int8")
+            query_values = query_values.astype(np.int32)
+        else:
+            query_values = query.astype(self.matrix.dtype).astype(np.float32)
+
+        scores = np.empty(len(self.paths), dtype=np.float32)
+        for start in range(0, len(self.paths), _SCORE_BLOCK_SIZE):
+            block = self.matrix[start:start + _SCORE_BLOCK_SIZE]
+            if self.storage == "int8":
+                dots = (block.astype(np.int32) @ query_values).astype(np.float32)
+            else:
+                dots = block.astype(np.float32) @ query_values
+            scores[start:start + _SCORE_BLOCK_SIZE] = dots
+        return scores * self.scales / self.norms
+
+    def search(self, query_embedding, top_k: int = 5, rescore_multiplier: int = 4) -> List[tuple]:
+        """Returns the top_k (path, similarity) pairs, rescored with the full-precision query"""
+        if self.matrix is None or top_k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query_norm = float(np.linalg.norm(query)) or 1.0
+
+        # Fase aproximada: seleciona os candidatos na matriz quantizada
+        n_candidates = min(len(self.paths), top_k * max(rescore_multiplier, 1))
+        scores = self._approximate_scores(query)
+        if n_candidates < len(self.paths):
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        else:
+            candidates = np.arange(len(self.paths))
+
+        # Reavaliação exata dos candidatos com a consulta em precisão total
+        vectors = dequantize_embedding(self.matrix[candidates], self.scales[candidates])
+        exact = (vectors @ query) / (self.norms[candidates] * query_norm)
+        order = np.argsort(-exact)[:top_k]
+        return [(self.paths[candidates[i]], float(exact[i])) for i in order]
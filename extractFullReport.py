@@ -7,14 +7,17 @@ from typing import List, Dict
 from openai import OpenAI
 import colorama
 from tqdm import tqdm
+from backend_pool import BackendPool, hosts_from_env
+from pipeline import Pipeline, Stage
 
 # Initialize colorama for terminal colors
 colorama.init(autoreset=True)
 
-# Ollama client configuration
-client = OpenAI(
-    base_url='http://localhost:11434/v1',
-    api_key='ollama'
+# Ollama client configuration: one OpenAI-compatible client per host in OLLAMA_HOSTS
+backend_pool = BackendPool(
+    hosts_from_env(),
+    client_factory=lambda host: OpenAI(base_url=f"{host}/v1", api_key='ollama'),
+    health_path='/v1/models'
 )
 
 def log_info(message):
@@ -90,8 +93,27 @@ def collect_python_files(directory: str) -> List[str]:
     log_success(f"Found {total_files} Python files")
     return python_files
 
-def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:14b-instruct-q4_K_M") -> Dict:
-    """Generates documentation using LLM"""
+def summarize_file(result: Dict, model: str = "qwen2.5:14b-instruct-q4_K_M") -> str:
+    """Asks the LLM for the summary of one analyzed file"""
+    file_summary_prompt = f"Analyze the file {result['file']} and explain its purpose and key components:\n"
+    file_summary_prompt += f"Classes: {', '.join([cls['name'] for cls in result['classes']])}\n"
+    file_summary_prompt += f"Functions: {', '.join([func['name'] for func in result['functions']])}\n"
+    
+    file_summary_completion = backend_pool.call(lambda client: client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": "You are an expert in code analysis."},
+            {"role": "user", "content": file_summary_prompt}
+        ]
+    ))
+    return file_summary_completion.choices[0].message.content
+
+def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:14b-instruct-q4_K_M",
+                           summaries: Dict[str, str] = None) -> Dict:
+    """Generates documentation using LLM
+
+    Summaries already produced (e.g. by the pipeline in __main__) are reused by file path.
+    """
     documentation = {
         "project_overview": "",
         "file_summaries": {},
@@ -109,13 +131,13 @@ def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:1
     overview_prompt += "Describe the project's purpose, main components, and how they interact."
     
     try:
-        overview_completion = client.chat.completions.create(
+        overview_completion = backend_pool.call(lambda client: client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": "You are an expert in machine learning project analysis."},
                 {"role": "user", "content": overview_prompt}
             ]
-        )
+        ))
         documentation["project_overview"] = overview_completion.choices[0].message.content
         log_success("Project overview generated")
     except Exception as e:
@@ -123,22 +145,14 @@ def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:1
     
     # Individual file summaries
     log_info("Generating file summaries")
+    summaries = summaries or {}
     for result in tqdm(analysis_results, desc="Processing files"):
         try:
-            file_summary_prompt = f"Analyze the file {result['file']} and explain its purpose and key components:\n"
-            file_summary_prompt += f"Classes: {', '.join([cls['name'] for cls in result['classes']])}\n"
-            file_summary_prompt += f"Functions: {', '.join([func['name'] for func in result['functions']])}\n"
-            
-            file_summary_completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an expert in code analysis."},
-                    {"role": "user", "content": file_summary_prompt}
-                ]
-            )
-            
+            summary = summaries.get(result['file'])
+            if summary is None:
+                summary = summarize_file(result, model)
             documentation["file_summaries"][result['file']] = {
-                "summary": file_summary_completion.choices[0].message.content,
+                "summary": summary,
                 "details": result
             }
         except Exception as e:
@@ -148,13 +162,13 @@ def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:1
     log_info("Generating module interaction description")
     try:
         interaction_prompt = "Describe how the modules and components in this project interact with each other."
-        interaction_completion = client.chat.completions.create(
+        interaction_completion = backend_pool.call(lambda client: client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": "You are an expert in software architecture."},
                 {"role": "user", "content": interaction_prompt}
             ]
-        )
+        ))
         documentation["module_interactions"] = interaction_completion.choices[0].message.content
         log_success("Module interaction description generated")
     except Exception as e:
@@ -235,25 +249,42 @@ def save_documentation(documentation: Dict, output_dir: str = "project_docs"):
 if __name__ == "__main__":
     # Start of execution
     start_total_time = time.time()
+    backend_pool.start_health_checks()
     log_info("Starting project analysis")
     
     # Project directory
     project_dir = "/home/marcos/projetos_automatizacao/ENTENDER_textgrad/textgrad"
     
-    # File collection
-    python_files = collect_python_files(project_dir)
+    # Scan, analysis and summaries overlap: files are summarized while others are still being parsed
+    log_info("Starting pipelined file analysis and summaries")
+    python_files = (
+        os.path.join(root, file)
+        for root, _, files in os.walk(project_dir)
+        for file in files if file.endswith(".py")
+    )
+    def summarize(result):
+        try:
+            return result, summarize_file(result)
+        except Exception as e:
+            # O arquivo continua na documentação; generate_documentation tenta de novo
+            log_warning(f"Error generating summary for {result['file']}: {e}")
+            return result, None
     
-    # File analysis
-    log_info("Starting detailed file analysis")
+    pipeline = Pipeline([
+        Stage("analyze", lambda file: analyze_file(file) or None, workers=4),
+        Stage("summarize", summarize, workers=max(2, len(backend_pool.backends)))
+    ], on_error=lambda stage, item, e: log_warning(f"Error in {stage} stage for {item}: {e}"))
     results = []
-    for file in tqdm(python_files, desc="Analyzing files"):
-        file_result = analyze_file(file)
-        if file_result:
-            results.append(file_result)
+    summaries = {}
+    for result, summary in tqdm(pipeline.run(python_files), desc="Processing files"):
+        results.append(result)
+        if summary is not None:
+            summaries[result['file']] = summary
+    results.sort(key=lambda result: result['file'])
     
     # Documentation generation
     log_info("Generating documentation with AI assistant")
-    documentation = generate_documentation(results)
+    documentation = generate_documentation(results, summaries=summaries)
     
     # Saving documentation
     save_documentation(documentation)
@@ -1,6 +1,7 @@
 import os
-import ollama
 import chromadb
+from lexical_index import BM25Index, fuse_results
+from main_functions import embed_query, llm_embeddings
 
 class SemanticSearchChroma:
     def __init__(self, collection_name='document_embeddings'):
@@ -9,6 +10,9 @@ class SemanticSearchChroma:
         """
         self.client = chromadb.PersistentClient(path="./chroma_storage")
         self.collection = self.client.get_or_create_collection(name=collection_name)
+        # Índice lexical mantido ao lado da coleção para buscas sem embedding
+        self.lexical_index_path = os.path.join("./chroma_storage", f"{collection_name}.bm25.json")
+        self.lexical_index = BM25Index.load(self.lexical_index_path)
 
     def add_documents(self, directory):
         """
@@ -22,10 +26,7 @@ class SemanticSearchChroma:
                     content = file.read()
                 
                 # Gera embedding
-                embedding = ollama.embeddings(
-                    model='mxbai-embed-large', 
-                    prompt=content
-                )['embedding']
+                embedding = llm_embeddings(content)
                 
                 # Adiciona ao ChromaDB
                 self.collection.add(
@@ -33,22 +34,87 @@ class SemanticSearchChroma:
                     documents=[content],
                     ids=[filename]
                 )
+                self.lexical_index.add_document(filename, content)
 
-    def search(self, query, n_results=3):
+        self.save_lexical_index()
+
+    def upsert_document(self, doc_id, content, embedding=None):
         """
-        Busca semântica com ChromaDB
+        Adiciona ou atualiza um documento na coleção e no índice lexical
         """
-        query_embedding = ollama.embeddings(
-            model='mxbai-embed-large', 
-            prompt=query
-        )['embedding']
-        
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results
+        if embedding is None:
+            embedding = llm_embeddings(content)
+        self.collection.upsert(
+            embeddings=[list(embedding)],
+            documents=[content],
+            ids=[doc_id]
         )
-        
-        return results
+        self.lexical_index.add_document(doc_id, content)
+
+    def delete_document(self, doc_id):
+        """
+        Remove um documento da coleção e do índice lexical
+        """
+        self.collection.delete(ids=[doc_id])
+        self.lexical_index.remove_document(doc_id)
+
+    def save_lexical_index(self):
+        """
+        Grava o índice lexical ao lado do armazenamento do ChromaDB
+        """
+        self.lexical_index.save(self.lexical_index_path)
+
+    def _documents_for(self, ids):
+        """
+        Recupera o conteúdo dos documentos na ordem dos ids informados
+        """
+        if not ids:
+            return []
+        stored = self.collection.get(ids=ids)
+        by_id = dict(zip(stored['ids'], stored['documents']))
+        return [by_id.get(doc_id) for doc_id in ids]
+
+    def search(self, query, n_results=3, mode='vector', alpha=0.5, embedding_timeout=None):
+        """
+        Busca semântica com ChromaDB
+
+        mode pode ser 'vector', 'lexical' (somente BM25, sem chamada de embedding)
+        ou 'hybrid'. No modo híbrido, se o embedding da consulta não ficar pronto
+        em embedding_timeout segundos, retorna apenas o resultado lexical.
+        """
+        if mode not in ('vector', 'lexical', 'hybrid'):
+            raise ValueError(f"Unknown search mode '{mode}'")
+
+        lexical_results = []
+        if mode in ('lexical', 'hybrid'):
+            lexical_results = self.lexical_index.search(query, n_results * 4)
+
+        query_embedding = None
+        if mode != 'lexical':
+            query_embedding = embed_query(query, embedding_timeout)
+
+        if query_embedding is None:
+            ranked = lexical_results[:n_results]
+        else:
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results if mode == 'vector' else n_results * 4
+            )
+            if mode == 'vector':
+                return results
+            # Converte distâncias em similaridade antes de combinar com o BM25
+            vector_results = [
+                (doc_id, 1.0 / (1.0 + distance))
+                for doc_id, distance in zip(results['ids'][0], results['distances'][0])
+            ]
+            ranked = fuse_results(lexical_results, vector_results, alpha, n_results)
+
+        ids = [doc_id for doc_id, _ in ranked]
+        return {
+            'ids': [ids],
+            'documents': [self._documents_for(ids)],
+            'scores': [[score for _, score in ranked]]
+        }
 
 def main():
     base_dir = '/home/marcos/projetos_automatizacao/meu_primeiro_agent/_relatorios/'
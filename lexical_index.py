@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase terms, also breaking snake_case and CamelCase symbols"""
+    tokens = []
+    for symbol in re.findall(r"\w+", text, re.UNICODE):
+        parts = [part for word in _WORD_RE.findall(symbol)
+                 for part in ((_CAMEL_RE.findall(word) if word.isascii() else None) or [word])]
+        tokens.extend(part.lower() for part in parts)
+        # Mantém o símbolo completo para que buscas pelo nome exato pontuem mais
+        if len(parts) > 1:
+            tokens.append(symbol.lower())
+    return tokens
+
+def build_search_text(file_info: Dict, report: str = "") -> str:
+    """Builds the text indexed for a file from analyze_file output and its report"""
+    parts = [file_info.get("filename") or os.path.basename(file_info.get("file", ""))]
+    for cls in file_info.get("classes", []):
+        parts.append(cls["name"])
+        parts.extend(cls.get("methods", []))
+    for func in file_info.get("functions", []):
+        parts.append(func["name"])
+        parts.extend(func.get("args", []))
+    parts.extend(file_info.get("docstrings", []))
+    if report:
+        parts.append(report)
+    return "\n".join(parts)
+
+class BM25Index:
+    """
+    Índice invertido com pontuação BM25 para busca lexical.
+    Responde consultas sem depender do backend de embeddings.
+    """
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_lengths
+
+    def add_document(self, doc_id: str, text: str):
+        """Indexes a document, replacing any previous version with the same id"""
+        self.remove_document(doc_id)
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        length = sum(terms.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def doc_ids(self) -> List[str]:
+        """Ids of every indexed document"""
+        return list(self.doc_lengths)
+
+    def remove_document(self, doc_id: str):
+        """Removes a document from the index if present"""
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in [term for term, docs in self.postings.items() if doc_id in docs]:
+            del self.postings[term][doc_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def search(self, query: str, top_k: int = 5) -> List[tuple]:
+        """Returns the top_k (doc_id, score) pairs for the query"""
+        n_docs = len(self.doc_lengths)
+        if not n_docs or top_k <= 0:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, frequency in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+    def save(self, path: str):
+        """Saves the index as JSON"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "postings": self.postings,
+                       "doc_lengths": self.doc_lengths}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Loads an index saved with save(), or returns an empty one if the file does not exist"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data.get("k1", 1.5), data.get("b", 0.75))
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.total_length = sum(index.doc_lengths.values())
+        return index
+
+def _normalize_scores(results: List[tuple]) -> Dict[str, float]:
+    if not results:
+        return {}
+    values = [score for _, score in results]
+    low, high = min(values), max(values)
+    if high == low:
+        return {doc_id: 1.0 for doc_id, _ in results}
+    return {doc_id: (score - low) / (high - low) for doc_id, score in results}
+
+def fuse_results(lexical: List[tuple], vector: List[tuple], alpha: float = 0.5,
+                 top_k: Optional[int] = None) -> List[tuple]:
+    """
+    Combines lexical and vector (doc_id, score) lists into one ranking.
+    Scores are min-max normalized per list; alpha is the weight of the vector score.
+    """
+    lexical_scores = _normalize_scores(lexical)
+    vector_scores = _normalize_scores(vector)
+    fused = {
+        doc_id: alpha * vector_scores.get(doc_id, 0.0) + (1 - alpha) * lexical_scores.get(doc_id, 0.0)
+        for doc_id in set(lexical_scores) | set(vector_scores)
+    }
+    ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)
+    return ranked[:top_k] if top_k is not None else ranked
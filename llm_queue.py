@@ -0,0 +1,89 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+class LLMRequestQueue:
+    """
+    Fila limitada de requisições ao LLM compartilhada entre vários projetos.
+    Um número fixo de workers atende os pedidos; quando a fila enche,
+    submit() bloqueia e segura quem está produzindo prompts.
+    """
+    def __init__(self, chat_fn: Callable[[str, List[Dict]], str],
+                 max_concurrency: int = 2, max_pending: int = 32):
+        self.chat_fn = chat_fn
+        self.max_concurrency = max_concurrency
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "fallbacks": 0, "busy_seconds": 0.0}
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"llm-worker-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, model: str, messages: List[Dict], fallback_model: str = None) -> Future:
+        """Queues a chat request and returns a Future with the reply text
+
+        If the request fails and fallback_model is given, it is retried once with that model.
+        """
+        future = Future()
+        with self._lock:
+            self._stats["submitted"] += 1
+        self._queue.put((future, model, messages, fallback_model))
+        return future
+
+    def _chat(self, model: str, messages: List[Dict], fallback_model: str = None) -> str:
+        try:
+            return self.chat_fn(model, messages)
+        except Exception:
+            if fallback_model is None or fallback_model == model:
+                raise
+        with self._lock:
+            self._stats["fallbacks"] += 1
+        return self.chat_fn(fallback_model, messages)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, model, messages, fallback_model = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            start_time = time.time()
+            try:
+                future.set_result(self._chat(model, messages, fallback_model))
+                outcome = "completed"
+            except Exception as e:
+                future.set_exception(e)
+                outcome = "failed"
+            with self._lock:
+                self._stats[outcome] += 1
+                self._stats["busy_seconds"] += time.time() - start_time
+
+    def stats(self) -> Dict:
+        """Returns request counters, throughput and worker utilization"""
+        with self._lock:
+            stats = dict(self._stats)
+        elapsed = max(time.time() - self._started_at, 1e-9)
+        stats["pending"] = self._queue.qsize()
+        stats["requests_per_second"] = stats["completed"] / elapsed
+        stats["utilization"] = stats["busy_seconds"] / (elapsed * self.max_concurrency)
+        return stats
+
+    def close(self):
+        """Stops the workers after the queued requests are served"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
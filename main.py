@@ -1,32 +1,61 @@
 import sys
 import os
+import time
+import threading
+
+# Marca o início do processo para o modo de medição de inicialização
+_PROCESS_START = time.perf_counter()
+
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog, QCheckBox,
     QTextEdit, QSplitter, QTreeView, QMenu, QAction
 )
-from PyQt5.QtCore import Qt, QDir, pyqtSignal
+from PyQt5.QtCore import Qt, QDir, QTimer, pyqtSignal
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from ollama import chat
-from ollama import ChatResponse
-from extract_embedding import SemanticSearchChroma
-from main_functions import (
-    collect_python_files,
-    generate_documentation,
-    analyze_file,
-    save_documentation,
-    log_info,
-    log_error
-)
-
-searcher = SemanticSearchChroma()
+from model_routing import ModelRouter
+
+# ollama, chromadb, numpy e main_functions são importados no primeiro uso
+# ou pelo aquecimento em segundo plano, para que a janela abra rapidamente
+_searcher = None
+_searcher_lock = threading.Lock()
+
+def get_searcher():
+    """Returns the shared ChromaDB searcher, opening the store on first use"""
+    global _searcher
+    with _searcher_lock:
+        if _searcher is None:
+            from extract_embedding import SemanticSearchChroma
+            _searcher = SemanticSearchChroma()
+    return _searcher
+
+def warm_up_backends():
+    """Loads the heavy modules and the ChromaDB store, returning the elapsed seconds"""
+    start_time = time.perf_counter()
+    import main_functions
+    import ollama
+    get_searcher()
+    return time.perf_counter() - start_time
 
 class DocumentationApp(QMainWindow):
+    # Emitido (a partir da thread de aquecimento) quando os backends estão prontos
+    backends_ready = pyqtSignal(float)
+    # Emitidos pelas threads de geração para atualizar a interface
+    status_message = pyqtSignal(str)
+    documentation_ready = pyqtSignal(dict)
+    reports_ready = pyqtSignal()
+    task_finished = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Automated Project Documentation")
         self.setGeometry(100, 100, 1200, 800)
         self.localizacao_da_pasta = None
+        # Uma geração por vez: duas execuções gravariam o mesmo journal e a mesma pasta
+        self.task_running = False
+        self.reports_available = False
+        # Arquivos triviais usam template, simples um modelo pequeno, complexos o grande
+        self.model_router = ModelRouter()
 
         # Main central widget
         main_widget = QWidget()
@@ -59,8 +88,8 @@ class DocumentationApp(QMainWindow):
         )
 
         # Generate Report Button
-        generate_button = QPushButton("Generate Documentation")
-        generate_button.clicked.connect(self.generate_documentation)
+        self.generate_button = QPushButton("Generate Documentation")
+        self.generate_button.clicked.connect(self.generate_documentation)
 
         # Add widgets to sidebar
         sidebar_layout.addWidget(dir_label)
@@ -68,12 +97,12 @@ class DocumentationApp(QMainWindow):
         sidebar_layout.addWidget(browse_button)
         sidebar_layout.addWidget(self.partial_report_checkbox)
         sidebar_layout.addWidget(self.partial_criteria_input)
-        sidebar_layout.addWidget(generate_button)
+        sidebar_layout.addWidget(self.generate_button)
 
         # Generate Individual Reports Button
-        generate_individual_button = QPushButton("Generate Individual Reports")
-        generate_individual_button.clicked.connect(self.generate_individual_reports)
-        sidebar_layout.addWidget(generate_individual_button)
+        self.generate_individual_button = QPushButton("Generate Individual Reports")
+        self.generate_individual_button.clicked.connect(self.generate_individual_reports)
+        sidebar_layout.addWidget(self.generate_individual_button)
 
         # Generate Embeddings Button
         self.generate_embedding_button = QPushButton("Gerar embeddings")
@@ -105,14 +134,73 @@ class DocumentationApp(QMainWindow):
         main_layout.addWidget(sidebar)
         main_layout.addWidget(content_area)
 
+        self.status_message.connect(self.results_text.setText)
+        self.documentation_ready.connect(self.display_documentation_results)
+        self.reports_ready.connect(self.enable_new_button)
+        self.task_finished.connect(self.finish_background_task)
+
     def enable_new_button(self):
+        self.reports_available = True
         self.generate_embedding_button.setEnabled(True)
 
+    def run_in_background(self, message, work):
+        """Runs work() in a background thread; the generate buttons stay disabled until it ends"""
+        if self.task_running:
+            return
+        self.task_running = True
+        for button in (self.generate_button, self.generate_individual_button, self.generate_embedding_button):
+            button.setEnabled(False)
+        self.results_text.setText(message)
+
+        def worker():
+            try:
+                work()
+            finally:
+                self.task_finished.emit()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_background_task(self):
+        self.task_running = False
+        self.generate_button.setEnabled(True)
+        self.generate_individual_button.setEnabled(True)
+        self.generate_embedding_button.setEnabled(self.reports_available)
+
+    def start_background_warm_up(self):
+        """Loads heavy dependencies in a background thread after the window is shown"""
+        def worker():
+            try:
+                elapsed = warm_up_backends()
+            except Exception as e:
+                try:
+                    from main_functions import log_warning
+                except Exception:
+                    # O próprio main_functions pode ser o que falhou ao carregar
+                    log_warning = lambda message: print(f"[WARN] {message}")
+                log_warning(f"Background warm-up failed: {e}")
+                elapsed = -1.0
+            self.backends_ready.emit(elapsed)
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def generate_embedding(self):
-        if self.localizacao_da_pasta is not None:
-            searcher.add_documents(self.localizacao_da_pasta)
-        else:
+        if self.localizacao_da_pasta is None:
             print("Localização da pasta não definida")
+            return
+
+        reports_dir = self.localizacao_da_pasta
+
+        def worker():
+            try:
+                get_searcher().add_documents(reports_dir)
+                self.status_message.emit("Embeddings generated successfully!")
+            except Exception as e:
+                from main_functions import log_error
+                log_error(f"Error generating embeddings: {e}")
+                self.status_message.emit(f"An error occurred: {str(e)}")
+
+        # Em segundo plano: relatórios por duplo clique continuam respondendo, com prioridade
+        self.run_in_background("Generating embeddings...", worker)
 
     def select_directory(self):
         """Open directory selection dialog"""
@@ -129,6 +217,8 @@ class DocumentationApp(QMainWindow):
     
     def populate_file_tree(self, directory):
         """Populate file tree with project structure"""
+        from main_functions import log_info, log_error
+
         model = QStandardItemModel()
         root_item = model.invisibleRootItem()
         
@@ -168,46 +258,25 @@ class DocumentationApp(QMainWindow):
         
         # Verifica se é um arquivo (não um diretório)
         if os.path.isfile(file_path):
+            from main_functions import analyze_file, log_error
+
             print(f"Arquivo selecionado: {file_path}")
             
             try:
                 file_result = analyze_file(file_path)
                 if file_result:
-                    report = self.generate_file_report(file_path, file_result)
+                    # O usuário está esperando: passa à frente dos relatórios e embeddings em lote
+                    report = self.generate_file_report(file_path, file_result, priority="interactive")
                     self.results_text.setText(report)
             except Exception as e:
                 log_error(f"Erro ao gerar relatório para {file_path}: {e}")
                 self.results_text.setText(f"Erro ao analisar arquivo: {e}")
 
-    def generate_file_report(self, file, file_result):
-        # Create a prompt for the LLM
-        prompt = f"""
-        Extract the most relevant information from the file {file} and generate a concise and informative text describing its content. 
-        The generated text should be optimized for semantic search using embeddings.
-
-        Desired output example:
-
-        Main topics: climate change, agriculture, environmental impact, food security, data analysis, statistical modeling.
-        Content: This scientific study investigates the effects of climate change on global agricultural production. 
-        By analyzing historical data and future projections, the document demonstrates how extreme climate events, 
-        such as droughts and floods, affect agricultural productivity and food availability. 
-        The authors propose adaptation and mitigation measures to ensure food security in a global warming scenario.
-        """
+    def generate_file_report(self, file, file_result, priority="batch"):
+        """Generate the report of one file with the model of its complexity tier"""
+        from main_functions import generate_file_report
 
-        # Call the LLM
-        response: ChatResponse = chat(model='qwen2.5:14b-instruct-q4_K_M', messages=[
-            {
-                'role':'system',
-                'content': 'You are an expert in code analysis.'
-            },
-            {
-                'role': 'user',
-                'content': prompt
-            }
-        ])
-        
-        # Return the report generated by the LLM
-        return response.message.content
+        return generate_file_report(file, file_result, router=self.model_router, priority=priority)
 
     def generate_documentation(self):
         project_dir = self.dir_input.text()
@@ -215,12 +284,26 @@ class DocumentationApp(QMainWindow):
             self.results_text.setText("Please select a project directory")
             return
         
-        try:
-            documentation = generate_documentation(project_dir)
-            self.display_documentation_results(documentation)
-        except Exception as e:
-            log_error(f"Error generating documentation: {e}")
-            self.results_text.setText(f"An error occurred: {str(e)}")
+        def worker():
+            from main_functions import run_documentation_pipeline, log_error
+            summarized = [0]
+
+            def on_summary(result, summary):
+                summarized[0] += 1
+                self.status_message.emit(f"Summarized {summarized[0]} files (latest: {result['filename']})...")
+
+            try:
+                pipeline_result = run_documentation_pipeline(
+                    project_dir, os.path.join(project_dir, "project_docs"),
+                    router=self.model_router, on_summary=on_summary
+                )
+                self.documentation_ready.emit(pipeline_result["documentation"])
+            except Exception as e:
+                log_error(f"Error generating documentation: {e}")
+                self.status_message.emit(f"An error occurred: {str(e)}")
+
+        # O pipeline roda fora da thread da interface, que segue respondendo
+        self.run_in_background("Generating documentation...", worker)
 
     def generate_individual_reports(self):
         project_dir = self.dir_input.text()
@@ -228,32 +311,46 @@ class DocumentationApp(QMainWindow):
             self.results_text.setText("Please select a project directory")
             return
         
-        try:
-            # Collect Python files
-            python_files = collect_python_files(project_dir)
-            
-            # Create a separate folder to store individual reports
-            reports_dir = os.path.join(project_dir, "_relatorios")
-            self.localizacao_da_pasta = reports_dir
-            os.makedirs(reports_dir, exist_ok=True)
-            
-            # Generate individual reports for each file
-            for file in python_files:
-                file_result = analyze_file(file)
-                if file_result:
-                    # Generate a report for the file
-                    report = self.generate_file_report(file, file_result)
-                    
-                    # Save the report in a separate folder
-                    report_file = os.path.join(reports_dir, f"{os.path.basename(file)}.txt")
-                    with open(report_file, "w") as f:
-                        f.write(report)
-            
-            self.results_text.setText("Individual reports generated successfully!")
-            self.enable_new_button()
-        except Exception as e:
-            log_error(f"Error generating individual reports: {e}")
-            self.results_text.setText(f"An error occurred: {str(e)}")
+        # Create a separate folder to store individual reports
+        reports_dir = os.path.join(project_dir, "_relatorios")
+        self.localizacao_da_pasta = reports_dir
+
+        def worker():
+            from main_functions import (iter_python_files, analyze_file, report_file_name, get_scheduler,
+                                        log_info, log_warning, log_error)
+            from pipeline import Pipeline, Stage
+
+            def write(item):
+                # Save the report in a separate folder
+                file, report = item
+                report_file = os.path.join(reports_dir, report_file_name(project_dir, file))
+                with open(report_file, "w") as f:
+                    f.write(report)
+                return file
+
+            # Análise, relatórios e gravação se sobrepõem, arquivo a arquivo
+            pipeline = Pipeline([
+                Stage("analyze", lambda file: analyze_file(file) or None, workers=4),
+                Stage("report", lambda result: (result['file'], self.generate_file_report(result['file'], result)),
+                      workers=2),
+                Stage("write", write)
+            ], on_error=lambda stage, item, e: log_warning(f"Error in {stage} stage: {e}"))
+            try:
+                os.makedirs(reports_dir, exist_ok=True)
+                written = 0
+                for file in pipeline.run(iter_python_files(project_dir)):
+                    written += 1
+                    self.status_message.emit(f"Generated {written} reports (latest: {os.path.basename(file)})...")
+                
+                log_info("Model routing: " + "; ".join(self.model_router.report_lines()))
+                log_info("Request scheduler: " + "; ".join(get_scheduler().report_lines()))
+                self.status_message.emit("Individual reports generated successfully!")
+                self.reports_ready.emit()
+            except Exception as e:
+                log_error(f"Error generating individual reports: {e}")
+                self.status_message.emit(f"An error occurred: {str(e)}")
+
+        self.run_in_background("Generating individual reports...", worker)
 
     def show_context_menu(self, pos):
         """Show context menu for selected file in the tree view"""
@@ -280,9 +377,31 @@ class DocumentationApp(QMainWindow):
         self.results_text.setText(results_text)
 
 def main():
+    # --startup-time: mede a inicialização, espera o aquecimento e encerra
+    measure_startup = "--startup-time" in sys.argv
+    imports_done = time.perf_counter()
+
     app = QApplication(sys.argv)
     main_window = DocumentationApp()
     main_window.show()
+    window_shown = time.perf_counter()
+
+    def report_first_frame():
+        first_frame = time.perf_counter()
+        print(f"[STARTUP] GUI imports:       {imports_done - _PROCESS_START:.3f}s")
+        print(f"[STARTUP] Window shown:      {window_shown - _PROCESS_START:.3f}s")
+        print(f"[STARTUP] Event loop ready:  {first_frame - _PROCESS_START:.3f}s")
+
+    def report_backends_ready(elapsed):
+        if elapsed >= 0:
+            print(f"[STARTUP] Backends ready:    {time.perf_counter() - _PROCESS_START:.3f}s "
+                  f"(warm-up took {elapsed:.3f}s in background)")
+        app.quit()
+
+    if measure_startup:
+        QTimer.singleShot(0, report_first_frame)
+        main_window.backends_ready.connect(report_backends_ready)
+    QTimer.singleShot(0, main_window.start_background_warm_up)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -2,19 +2,37 @@ import os
 import ast
 import json
 import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Iterator
 import ollama
 from ollama import chat, ChatResponse
 import colorama
 from tqdm import tqdm
 import markdown
+from site_output import save_documentation_site
+from pipeline import Pipeline, Stage
+from run_journal import RunJournal, JOURNAL_NAME, results_key
+from embedding_store import QuantizedEmbeddingIndex, save_embedding
+from lexical_index import BM25Index, build_search_text, fuse_results
+from backend_pool import BackendPool, hosts_from_env
+from request_scheduler import RequestScheduler, INTERACTIVE, BATCH
+from prompt_builder import DEFAULT_TOKEN_BUDGET, build_file_summary_prompt, build_file_report_prompt
 
 # Configurações existentes mantidas
 colorama.init(autoreset=True)
 
 # Adicionando modelo de embeddings
 
+# Pool de hosts de inferência (configure_llm_backends ou variável OLLAMA_HOSTS)
+_backend_pool = None
+_backend_pool_lock = threading.Lock()
+
+# Todas as chamadas de chat e embeddings do processo passam pelo escalonador
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
 def log_info(message):
     """Prints informative messages in blue"""
     print(f"{colorama.Fore.CYAN}[INFO] {message}{colorama.Fore.RESET}")
@@ -48,8 +66,11 @@ def analyze_file(file_path: str) -> Dict:
                 "imports": [],
                 "docstrings": [],
                 "complexity": 0,
+                "lines": code.count("\n") + 1 if code else 0,
                 "summary": ""  # Placeholder for AI-generated summary
             }
+            # Mesma medida usada por função: número de nós da AST
+            file_info["complexity"] = len(list(ast.walk(tree)))
         
         # Existing AST analysis logic
         for node in ast.iter_child_nodes(tree):
@@ -86,70 +107,307 @@ def generate_file_summary(file_info: Dict) -> str:
     summary += f"Funções: {', '.join([func['name'] for func in file_info['functions']] or ['Nenhuma'])}\n"
     return summary
 
-def collect_python_files(directory: str) -> List[str]:
-    """Collects all Python files in a directory"""
-    log_info(f"Collecting Python files in: {directory}")
-    python_files = []
-    total_files = 0
+def iter_python_files(directory: str) -> Iterator[str]:
+    """Yields the Python files in a directory as they are found"""
     for root, _, files in os.walk(directory):
         for file in files:
             if file.endswith(".py"):
-                python_files.append(os.path.join(root, file))
-                total_files += 1
+                yield os.path.join(root, file)
+
+def collect_python_files(directory: str) -> List[str]:
+    """Collects all Python files in a directory"""
+    log_info(f"Collecting Python files in: {directory}")
+    python_files = list(iter_python_files(directory))
     
-    log_success(f"Found {total_files} Python files")
+    log_success(f"Found {len(python_files)} Python files")
     return python_files
 
-def generate_embeddings(descriptions: Dict[str, str]) -> Dict[str, np.ndarray]:
-    """Generate embeddings for file descriptions"""
-    log_info("Generating semantic embeddings")
+def configure_llm_backends(hosts: List[str], strategy: str = "least_outstanding",
+                           health_interval: float = 10.0) -> BackendPool:
+    """Spreads chat and embedding requests across several Ollama hosts"""
+    global _backend_pool
+    with _backend_pool_lock:
+        if _backend_pool is not None:
+            _backend_pool.close()
+        _backend_pool = BackendPool(hosts, strategy=strategy, health_interval=health_interval)
+        _backend_pool.start_health_checks()
+        log_info(f"Routing LLM requests across {len(hosts)} hosts ({strategy})")
+        return _backend_pool
+
+def get_backend_pool():
+    """Returns the configured backend pool, creating it from OLLAMA_HOSTS on first use"""
+    global _backend_pool
+    with _backend_pool_lock:
+        if _backend_pool is None and "OLLAMA_HOSTS" in os.environ:
+            _backend_pool = BackendPool(hosts_from_env())
+            _backend_pool.start_health_checks()
+        return _backend_pool
+
+def configure_scheduler(max_concurrency: int = 3, reserved_interactive: int = 1,
+                        max_pending_batch: int = 64) -> RequestScheduler:
+    """Sets how many backend calls run at once and how many workers are kept for interactive requests"""
+    global _scheduler
+    with _scheduler_lock:
+        previous = _scheduler
+        _scheduler = RequestScheduler(max_concurrency, reserved_interactive, max_pending_batch)
+    if previous is not None:
+        previous.close()
+    return _scheduler
+
+def get_scheduler() -> RequestScheduler:
+    """Returns the process-wide request scheduler, creating it with default limits on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+def _embeddings_now(prompt: str, model: str) -> List[float]:
+    pool = get_backend_pool()
+    if pool is not None:
+        return pool.embeddings(model, prompt)
+    return ollama.embeddings(model=model, prompt=prompt)['embedding']
+
+def llm_embeddings(prompt: str, model: str = 'mxbai-embed-large', priority: str = BATCH) -> List[float]:
+    """Embeds a text through the backend pool, or the default Ollama host
+
+    priority is "interactive" for requests a user is waiting on, or "batch".
+    """
+    return get_scheduler().submit(_embeddings_now, prompt, model, priority=priority).result()
+
+def generate_embeddings(descriptions: Dict[str, str], storage: str = "float32") -> Dict[str, np.ndarray]:
+    """Generate embeddings for file descriptions
+
+    storage selects how vectors are written to disk: "float32" (full precision),
+    "float16" or "int8" (scalar quantization with a per-vector scale factor).
+    """
+    log_info(f"Generating semantic embeddings ({storage} storage)")
     embeddings = {}
     
     for file_path, description in descriptions.items():
-        embedding = ollama.embeddings(
-            model='mxbai-embed-large',
-            prompt=description
-        )
+        embedding = np.asarray(llm_embeddings(description), dtype=np.float32)
         embeddings[file_path] = embedding
         
         # Opcional: salvar embeddings
-        embedding_dir = os.path.join(os.path.dirname(file_path), '.project_docs')
-        os.makedirs(embedding_dir, exist_ok=True)
-        np.save(os.path.join(embedding_dir, f"{os.path.basename(file_path)}.embedding.npy"), embedding)
+        save_embedding(file_path, embedding, storage)
     
     log_success(f"Generated {len(embeddings)} embeddings")
     return embeddings
 
-def search_project_files(project_dir: str, query: str, top_k: int = 5) -> List[tuple]:
-    """Semantic search across project files"""
-    log_info(f"Performing semantic search for query: {query}")
-    query_embedding = ollama.embeddings(
-        model='mxbai-embed-large',
-        prompt=query
-    )
-    similarities = {}
+def lexical_index_path(project_dir: str) -> str:
+    """Returns the path of the project's BM25 index"""
+    return os.path.join(project_dir, '.project_docs', 'lexical_index.json')
+
+def report_file_name(project_dir: str, file_path: str) -> str:
+    """Name of a file's report in _relatorios, also its ChromaDB id: the dotted path relative to the project"""
+    relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(project_dir))
+    return relative.replace(os.sep, ".") + ".txt"
+
+def build_lexical_index(analysis_results: List[Dict], project_dir: str, reports_dir: str = None) -> BM25Index:
+    """Builds the BM25 index from analyze_file results and the individual reports, if any"""
+    log_info("Building lexical index")
+    if reports_dir is None:
+        reports_dir = os.path.join(project_dir, "_relatorios")
+    index = BM25Index()
+    for result in analysis_results:
+        report = ""
+        report_file = os.path.join(reports_dir, report_file_name(project_dir, result['file']))
+        if os.path.exists(report_file):
+            with open(report_file, "r", encoding="utf-8") as f:
+                report = f.read()
+        index.add_document(result['file'], build_search_text(result, report))
+    index.save(lexical_index_path(project_dir))
+    log_success(f"Indexed {len(index)} files")
+    return index
+
+def embed_query(query: str, timeout: float = None):
+    """Embeds a search query, returning None if the backend fails or takes longer than timeout seconds"""
+    # Consulta interativa: passa à frente dos embeddings batch na fila do escalonador
+    future = get_scheduler().submit(_embeddings_now, query, 'mxbai-embed-large', priority=INTERACTIVE)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        # Se ainda não começou, não ocupa o backend à toa
+        future.cancel()
+        log_warning(f"Embedding backend did not answer within {timeout:.2f} seconds")
+    except Exception as e:
+        log_warning(f"Error embedding query: {e}")
+    return None
+
+def search_project_files(project_dir: str, query: str, top_k: int = 5,
+                         storage: str = "float32", rescore_multiplier: int = 4,
+                         mode: str = "vector", alpha: float = 0.5,
+                         embedding_timeout: float = None) -> List[tuple]:
+    """Semantic search across project files
+
+    Candidates are scored on the stored (possibly quantized) matrix and the best
+    top_k * rescore_multiplier of them are rescored against the full-precision query.
+
+    mode is "vector", "lexical" (BM25 only, no embedding call) or "hybrid". In hybrid
+    mode the lexical results are returned alone if the query embedding is not ready
+    within embedding_timeout seconds.
+    """
+    log_info(f"Performing {mode} search for query: {query}")
+    if mode not in ("vector", "lexical", "hybrid"):
+        raise ValueError(f"Unknown search mode '{mode}'")
+
+    lexical_results = []
+    if mode in ("lexical", "hybrid"):
+        lexical_results = BM25Index.load(lexical_index_path(project_dir)).search(query, top_k * rescore_multiplier)
+        if mode == "lexical":
+            sorted_results = lexical_results[:top_k]
+            log_success(f"Found {len(sorted_results)} relevant files")
+            return sorted_results
+
+    query_embedding = embed_query(query, embedding_timeout)
+    if query_embedding is None:
+        if mode == "hybrid":
+            log_warning("Falling back to lexical results")
+            return lexical_results[:top_k]
+        return []
     
-    # Buscar arquivos e embeddings
-    for root, _, files in os.walk(project_dir):
-        for file in files:
-            if file.endswith('.py'):
-                embedding_path = os.path.join(root, '.project_docs', f"{file}.embedding.npy")
-                if os.path.exists(embedding_path):
-                    file_embedding = np.load(embedding_path)
-                    # Calcula a similaridade entre os embeddings
-                    # A forma como você calcula a similaridade pode variar dependendo do tipo de embedding
-                    similarity = np.dot(query_embedding, file_embedding) / (
-                        np.linalg.norm(query_embedding) * np.linalg.norm(file_embedding)
-                    )
-                    similarities[os.path.join(root, file)] = similarity
+    # Carrega a matriz de embeddings do projeto no formato armazenado
+    index = QuantizedEmbeddingIndex.from_project(project_dir, storage)
+    log_info(f"Loaded {len(index)} embeddings ({index.nbytes / 1024:.1f} KiB, {storage})")
+    if not len(index):
+        log_warning(f"No stored embeddings found under {project_dir}")
+    elif index.converted:
+        log_warning(f"{index.converted} embeddings were stored in another format and converted to {storage}")
     
     # Ordenar e retornar top k resultados
-    sorted_results = sorted(similarities.items(), key=lambda x: x[1], reverse=True)[:top_k]
+    if mode == "hybrid":
+        vector_results = index.search(query_embedding, top_k * rescore_multiplier, rescore_multiplier)
+        sorted_results = fuse_results(lexical_results, vector_results, alpha, top_k)
+    else:
+        sorted_results = index.search(query_embedding, top_k, rescore_multiplier)
     log_success(f"Found {len(sorted_results)} relevant files")
     return sorted_results
 
-def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:14b-instruct-q4_K_M") -> Dict:
-    """Generates documentation using LLM"""
+def _chat_now(model: str, messages: List[Dict]) -> str:
+    pool = get_backend_pool()
+    if pool is not None:
+        return pool.chat(model, messages)
+    response: ChatResponse = chat(model=model, messages=messages)
+    return response.message.content
+
+def llm_chat(model: str, messages: List[Dict], priority: str = BATCH) -> str:
+    """Sends a chat request to Ollama and returns the reply text
+
+    priority is "interactive" for requests a user is waiting on, or "batch".
+    """
+    return get_scheduler().submit(_chat_now, model, messages, priority=priority).result()
+
+def _chat_with_fallback(model: str, messages: List[Dict], fallback_model: str = None,
+                        priority: str = BATCH) -> str:
+    """llm_chat, retried once with fallback_model if the first model fails"""
+    try:
+        return llm_chat(model, messages, priority=priority)
+    except Exception as e:
+        if fallback_model is None or fallback_model == model:
+            raise
+        log_warning(f"Model {model} failed ({e}), retrying with {fallback_model}")
+    return llm_chat(fallback_model, messages, priority=priority)
+
+def _request_chat(model: str, messages: List[Dict], llm_queue=None, fallback_model: str = None) -> Future:
+    """Runs a chat request now, or queues it when a shared LLM queue is given"""
+    if llm_queue is not None:
+        return llm_queue.submit(model, messages, fallback_model)
+    future = Future()
+    try:
+        future.set_result(_chat_with_fallback(model, messages, fallback_model))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def summarize_file(result: Dict, model: str = "qwen2.5:14b-instruct-q4_K_M",
+                   llm_queue=None, router=None, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Future:
+    """Requests the summary of one analyzed file
+
+    With a ModelRouter the file's complexity picks the model, and trivial files
+    get the template summary from generate_file_summary without any LLM call.
+    The prompt carries source excerpts packed into token_budget estimated tokens.
+    """
+    tier = router.tier_for(result) if router is not None else None
+    start_time = time.time()
+    if tier == "template":
+        future = Future()
+        future.set_result(generate_file_summary(result))
+    else:
+        if tier is not None:
+            model = router.model_for(tier)
+        file_summary_prompt = build_file_summary_prompt(result, token_budget)
+        
+        # Sem o modelo pequeno instalado, o arquivo ainda é resumido pelo grande
+        future = _request_chat(model, [
+            {'role':'system', 'content': 'You are an expert in code analysis.'},
+            {'role': 'user', 'content': file_summary_prompt}
+        ], llm_queue, router.fallback_for(tier) if router is not None else None)
+    if router is not None:
+        future.add_done_callback(lambda _: router.record(tier, start_time))
+    return future
+
+def generate_file_report(file_path: str, file_result: Dict, model: str = "qwen2.5:14b-instruct-q4_K_M",
+                         router=None, token_budget: int = DEFAULT_TOKEN_BUDGET, priority: str = BATCH) -> str:
+    """Generates a search-oriented report for one file, routed by complexity when a router is given"""
+    tier = router.tier_for(file_result) if router is not None else None
+    start_time = time.time()
+    if tier == "template":
+        report = generate_file_summary(file_result)
+        if file_result.get("docstrings"):
+            report += f"Docstrings: {' '.join(doc.strip() for doc in file_result['docstrings'])}\n"
+        router.record(tier, start_time)
+        return report
+    if tier is not None:
+        model = router.model_for(tier)
+
+    # Create a prompt for the LLM
+    prompt = build_file_report_prompt(file_path, file_result, token_budget)
+
+    # Call the LLM
+    report = _chat_with_fallback(model, [
+        {'role':'system', 'content': 'You are an expert in code analysis.'},
+        {'role': 'user', 'content': prompt}
+    ], router.fallback_for(tier) if router is not None else None, priority)
+    if router is not None:
+        router.record(tier, start_time)
+    return report
+
+def _journaled(journal, kind: str, key: str, request):
+    """Reuses a result still valid in the journal, or runs request()
+
+    Returns (future, reused); the caller journals a new result with
+    _journal_result once it has it, so it is on disk before it is used.
+    """
+    if journal is not None:
+        # Resumos valem só enquanto o arquivo não muda; os demais registros, pela chave
+        done = journal.summary_for(key) if kind == "summary" else journal.get(kind, key)
+        if done is not None:
+            future = Future()
+            future.set_result(done)
+            return future, True
+    return request(), False
+
+def _journal_result(journal, kind: str, key: str, result, reused: bool):
+    """Journals a result obtained through _journaled unless it came from the journal"""
+    if journal is None or reused:
+        return
+    if kind == "summary":
+        journal.record_summary(key, result)
+    else:
+        journal.record(kind, key, result)
+
+def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:14b-instruct-q4_K_M",
+                           llm_queue=None, router=None, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                           journal=None) -> Dict:
+    """Generates documentation using LLM
+
+    With llm_queue (an LLMRequestQueue) every prompt is submitted up front and
+    served by the queue workers; otherwise prompts run one after another.
+    With router (a ModelRouter) each file summary uses the model of its complexity tier.
+    token_budget caps the source excerpts included in each file summary prompt.
+    With journal (a RunJournal) results already journaled are not requested again
+    and new ones are journaled as they are collected.
+    """
     documentation = {
         "project_overview": "",
         "file_summaries": {},
@@ -166,53 +424,161 @@ def generate_documentation(analysis_results: List[Dict], model: str = "qwen2.5:1
     
     overview_prompt += "Describe the project's purpose, main components, and how they interact."
     
+    # Visão geral e interações valem para este conjunto de arquivos e análises
+    project_key = results_key(analysis_results) if journal is not None else ""
+    overview_request, overview_reused = _journaled(journal, "overview", project_key, lambda: _request_chat(model, [
+        {'role':'system', 'content': 'You are an expert in machine learning project analysis.'},
+        {'role': 'user', 'content': overview_prompt}
+    ], llm_queue))
+    
+    # Individual file summaries
+    log_info("Generating file summaries")
+    summary_requests = []
+    # A barra de progresso acompanha onde o tempo é gasto: aqui sem fila, na coleta com fila
+    for result in tqdm(analysis_results, desc="Processing files", disable=llm_queue is not None):
+        summary_requests.append((result, *_journaled(
+            journal, "summary", result['file'],
+            lambda: summarize_file(result, model, llm_queue, router, token_budget)
+        )))
+    
+    # Module interactions
+    log_info("Generating module interaction description")
+    interaction_prompt = "Describe how the modules and components in this project interact with each other."
+    interaction_request, interaction_reused = _journaled(journal, "interactions", project_key, lambda: _request_chat(model, [
+        {'role':'system', 'content': 'You are an expert in software architecture.'},
+        {'role': 'user', 'content': interaction_prompt}
+    ], llm_queue))
+    
     try:
-        response: ChatResponse = chat(model=model, messages=[
-            {'role':'system', 'content': 'You are an expert in machine learning project analysis.'},
-            {'role': 'user', 'content': overview_prompt}
-        ])
-        documentation["project_overview"] = response.message.content
+        documentation["project_overview"] = overview_request.result()
+        _journal_result(journal, "overview", project_key, documentation["project_overview"], overview_reused)
         log_success("Project overview generated")
     except Exception as e:
         log_error(f"Error generating project overview: {e}")
     
-    # Individual file summaries
-    log_info("Generating file summaries")
-    for result in tqdm(analysis_results, desc="Processing files"):
+    for result, request, reused in tqdm(summary_requests, desc="Processing files", disable=llm_queue is None):
         try:
-            file_summary_prompt = f"Analyze the file {result['file']} and explain its purpose and key components:\n"
-            file_summary_prompt += f"Classes: {', '.join([cls['name'] for cls in result['classes']] or ['Nenhuma'])}\n"
-            file_summary_prompt += f"Functions: {', '.join([func['name'] for func in result['functions']] or ['Nenhuma'])}\n"
-            
-            response: ChatResponse = chat(model=model, messages=[
-                {'role':'system', 'content': 'You are an expert in code analysis.'},
-                {'role': 'user', 'content': file_summary_prompt}
-            ])
-            
+            summary = request.result()
+            _journal_result(journal, "summary", result['file'], summary, reused)
             documentation["file_summaries"][result['file']] = {
-                "summary": response.message.content,
+                "summary": summary,
                 "details": result
             }
         except Exception as e:
             log_warning(f"Error generating summary for {result['file']}: {e}")
     
-    # Module interactions
-    log_info("Generating module interaction description")
     try:
-        interaction_prompt = "Describe how the modules and components in this project interact with each other."
-        response: ChatResponse = chat(model=model, messages=[
-            {'role':'system', 'content': 'You are an expert in software architecture.'},
-            {'role': 'user', 'content': interaction_prompt}
-        ])
-        documentation["module_interactions"] = response.message.content
+        documentation["module_interactions"] = interaction_request.result()
+        _journal_result(journal, "interactions", project_key, documentation["module_interactions"], interaction_reused)
         log_success("Module interaction description generated")
     except Exception as e:
         log_error(f"Error generating module interactions: {e}")
     
+    if journal is not None:
+        journal.sync()
     return documentation
 
-def save_documentation(documentation: Dict, output_dir: str = "project_docs"):
-    """Saves documentation in multiple formats"""
+def run_documentation_pipeline(project_dir: str, output_dir: str = "project_docs",
+                               model: str = "qwen2.5:14b-instruct-q4_K_M", llm_queue=None, router=None,
+                               token_budget: int = DEFAULT_TOKEN_BUDGET, journal=None, analysis_pool=None,
+                               analysis_workers: int = 4, summary_workers: int = 2, site: bool = False,
+                               on_summary=None, stop_event: threading.Event = None) -> Dict:
+    """Documents a project with overlapping scan, analyze, summarize and write stages
+
+    Files are summarized while others are still being scanned and parsed, and each
+    summary is written to the journal (output_dir/run_journal.jsonl unless one is
+    given) as soon as it completes; on_summary(result, summary) is also called then.
+    The overview and module interactions are generated once every file is done.
+    Setting stop_event cancels the run before anything else is generated or saved.
+    Raises RuntimeError, without generating or saving anything, if any analysis
+    failed, nothing was analyzed, or every summary failed; the journal keeps the
+    completed work for a resumed run.
+    Returns the documentation, the analysis results, the number of summaries reused
+    from the journal and per-stage statistics.
+    """
+    own_journal = journal is None
+    if own_journal:
+        journal = RunJournal(os.path.join(output_dir, JOURNAL_NAME))
+    analysis_results = []
+
+    def analyze(file_path):
+        result = journal.analysis_for(file_path)
+        if result is None:
+            if analysis_pool is not None:
+                result = analysis_pool.submit(analyze_file, file_path).result()
+            else:
+                result = analyze_file(file_path)
+            if result:
+                journal.record_analysis(file_path, result)
+        if result:
+            analysis_results.append(result)
+        return result or None
+
+    resumed = [0]
+
+    def summarize(result):
+        summary = journal.summary_for(result['file'])
+        if summary is not None:
+            return result, summary, True
+        return result, summarize_file(result, model, llm_queue, router, token_budget).result(), False
+
+    def write(item):
+        result, summary, reused = item
+        if reused:
+            resumed[0] += 1
+        else:
+            journal.record_summary(result['file'], summary)
+        if on_summary is not None:
+            on_summary(result, summary)
+        return result
+
+    def log_stage_error(stage, item, e):
+        if isinstance(item, tuple):
+            item = item[0]
+        file_path = item['file'] if isinstance(item, dict) else item
+        log_warning(f"Error in {stage} stage for {file_path}: {e}")
+
+    pipeline = Pipeline([
+        Stage("analyze", analyze, workers=analysis_workers),
+        Stage("summarize", summarize, workers=summary_workers),
+        Stage("write", write)
+    ], on_error=log_stage_error, stop_event=stop_event)
+
+    try:
+        log_info(f"Running documentation pipeline for: {project_dir}")
+        for _ in tqdm(pipeline.run(iter_python_files(project_dir)), desc="Processing files"):
+            pass
+        if stop_event is not None and stop_event.is_set():
+            raise RuntimeError("Documentation run cancelled")
+        # Com a análise quebrada (ex.: pool de processos morto) não gera nem grava documentação vazia
+        stages = pipeline.stats()
+        if stages["analyze"]["errors"]:
+            raise RuntimeError(f"Analysis failed for {stages['analyze']['errors']} files")
+        if not analysis_results:
+            raise RuntimeError(f"No Python files could be analyzed in {project_dir}")
+        if stages["summarize"]["processed"] and stages["summarize"]["errors"] == stages["summarize"]["processed"]:
+            raise RuntimeError("Every file summary failed")
+        
+        # Visão geral e interações dependem de todos os arquivos; os resumos já estão no journal
+        analysis_results.sort(key=lambda result: result['file'])
+        documentation = generate_documentation(analysis_results, model, llm_queue, router, token_budget, journal)
+        if stop_event is not None and stop_event.is_set():
+            raise RuntimeError("Documentation run cancelled")
+        save_documentation(documentation, output_dir, site=site)
+    finally:
+        if own_journal:
+            journal.close()
+    return {"documentation": documentation, "analysis_results": analysis_results, "resumed": resumed[0],
+            "stages": pipeline.stats()}
+
+def save_documentation(documentation: Dict, output_dir: str = "project_docs", site: bool = False,
+                       site_workers: int = None):
+    """Saves documentation in multiple formats
+
+    With site=True the HTML output is a multi-page site in output_dir/site
+    (one page per module, rendered in parallel, unchanged pages kept) instead
+    of the single project_documentation.html page.
+    """
     log_info(f"Saving documentation to directory: {output_dir}")
     
     # Create output directory
@@ -258,6 +624,16 @@ def save_documentation(documentation: Dict, output_dir: str = "project_docs"):
     except Exception as e:
         log_error(f"Error saving Markdown: {e}")
     
+    if site:
+        site_dir = os.path.join(output_dir, "site")
+        try:
+            site_stats = save_documentation_site(documentation, site_dir, site_workers)
+            log_success(f"HTML site saved to: {site_dir} ({site_stats['written']} pages written, "
+                        f"{site_stats['unchanged']} unchanged, {site_stats['removed']} removed)")
+        except Exception as e:
+            log_error(f"Error saving HTML site: {e}")
+        return
+    
     # Convert to HTML
     try:
         html_content = markdown.markdown(markdown_content)
@@ -289,24 +665,12 @@ if __name__ == "__main__":
     # Project directory
     project_dir = "/home/marcos/projetos_automatizacao/ENTENDER_textgrad/textgrad"
     
-    # File collection
-    python_files = collect_python_files(project_dir)
-    
-    # File analysis
-    log_info("Starting detailed file analysis")
-    results = []
-    for file in tqdm(python_files, desc="Analyzing files"):
-        print(file)
-        file_result = analyze_file(file)
-        if file_result:
-            results.append(file_result)
-    
-    # Documentation generation
+    # Scan, analysis, summaries and saving run as overlapping pipeline stages
     log_info("Generating documentation with AI assistant")
-    documentation = generate_documentation(results)
+    pipeline_result = run_documentation_pipeline(project_dir)
     
-    # Saving documentation
-    save_documentation(documentation)
+    # Lexical index for fast searches
+    build_lexical_index(pipeline_result["analysis_results"], project_dir)
     
     # Total execution time
     end_total_time = time.time()
@@ -0,0 +1,95 @@
+import time
+import threading
+from typing import Dict, Optional
+
+# Níveis de roteamento, do mais barato ao mais caro
+TIERS = ("template", "small", "large")
+
+class ModelRouter:
+    """
+    Escolhe o modelo de cada resumo a partir das métricas de analyze_file.
+    Arquivos triviais usam o resumo por template (sem LLM), arquivos simples
+    vão para um modelo pequeno e só módulos complexos usam o modelo grande.
+    """
+    def __init__(self, small_model: str = "qwen2.5:3b-instruct-q4_K_M",
+                 large_model: str = "qwen2.5:14b-instruct-q4_K_M",
+                 template_max_complexity: int = 80, template_max_symbols: int = 2,
+                 small_max_complexity: int = 1500, small_max_symbols: int = 15,
+                 small_max_lines: int = 300):
+        self.models = {"template": None, "small": small_model, "large": large_model}
+        self.template_max_complexity = template_max_complexity
+        self.template_max_symbols = template_max_symbols
+        self.small_max_complexity = small_max_complexity
+        self.small_max_symbols = small_max_symbols
+        self.small_max_lines = small_max_lines
+        self._lock = threading.Lock()
+        self._stats = {tier: {"files": 0, "seconds": 0.0, "first_start": None, "last_end": None}
+                       for tier in TIERS}
+
+    def tier_for(self, file_info: Dict) -> str:
+        """Returns the tier for a file: 'template', 'small' or 'large'"""
+        complexity = file_info.get("complexity", 0)
+        symbols = len(file_info.get("classes", [])) + len(file_info.get("functions", []))
+        lines = file_info.get("lines", 0)
+        if complexity <= self.template_max_complexity and symbols <= self.template_max_symbols:
+            return "template"
+        if (complexity <= self.small_max_complexity and symbols <= self.small_max_symbols
+                and lines <= self.small_max_lines):
+            return "small"
+        return "large"
+
+    def model_for(self, tier: str) -> Optional[str]:
+        """Returns the model of a tier, or None when no LLM is used"""
+        return self.models[tier]
+
+    def fallback_for(self, tier: str) -> Optional[str]:
+        """Model to retry with when the tier's model fails (e.g. the small model is not installed)"""
+        return self.models["large"] if tier == "small" else None
+
+    def record(self, tier: str, start_time: float, end_time: float = None):
+        """Records one file served by a tier"""
+        end_time = end_time if end_time is not None else time.time()
+        with self._lock:
+            stats = self._stats[tier]
+            stats["files"] += 1
+            stats["seconds"] += end_time - start_time
+            if stats["first_start"] is None or start_time < stats["first_start"]:
+                stats["first_start"] = start_time
+            if stats["last_end"] is None or end_time > stats["last_end"]:
+                stats["last_end"] = end_time
+
+    def policy(self) -> Dict:
+        """Describes the routing thresholds and the model of each tier"""
+        return {
+            "template": {"model": None, "max_complexity": self.template_max_complexity,
+                         "max_symbols": self.template_max_symbols},
+            "small": {"model": self.models["small"], "max_complexity": self.small_max_complexity,
+                      "max_symbols": self.small_max_symbols, "max_lines": self.small_max_lines},
+            "large": {"model": self.models["large"]}
+        }
+
+    def stats(self) -> Dict:
+        """Returns files, average latency and throughput per tier (None when no time elapsed)"""
+        report = {}
+        with self._lock:
+            for tier, stats in self._stats.items():
+                span = (stats["last_end"] - stats["first_start"]) if stats["files"] else 0.0
+                report[tier] = {
+                    "model": self.models[tier],
+                    "files": stats["files"],
+                    "avg_seconds": stats["seconds"] / stats["files"] if stats["files"] else 0.0,
+                    "files_per_second": stats["files"] / span if span > 0 else None
+                }
+        return report
+
+    def report_lines(self):
+        """Human readable routing policy and per-tier throughput"""
+        policy = self.policy()
+        lines = []
+        for tier, stats in self.stats().items():
+            throughput = f"{stats['files_per_second']:.2f} files/s" if stats["files_per_second"] is not None else "n/a"
+            limits = ", ".join(f"{key}={value}" for key, value in policy[tier].items() if key != "model")
+            lines.append(f"{tier:<8} model={stats['model'] or 'none (template)'}"
+                         f"{' [' + limits + ']' if limits else ''}: {stats['files']} files, "
+                         f"avg {stats['avg_seconds']:.2f}s, {throughput}")
+        return lines
@@ -0,0 +1,160 @@
+import time
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, Iterable, Iterator, List
+
+# Marca o fim do fluxo entre um estágio e o seguinte
+_DONE = object()
+
+class Stage:
+    """Um estágio do pipeline: fn é aplicada a cada item por `workers` threads"""
+    def __init__(self, name: str, fn: Callable, workers: int = 1, queue_size: int = 16):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+class Pipeline:
+    """
+    Executa estágios encadeados por filas limitadas, para que todos trabalhem ao
+    mesmo tempo: cada item segue para o próximo estágio assim que fica pronto.
+    Filas cheias bloqueiam o estágio anterior (backpressure). Se fn retorna None
+    o item é descartado; exceções são passadas a on_error e o item também é descartado.
+    stop_event, se dado, cancela o pipeline quando setado (pode ser compartilhado entre vários).
+    """
+    def __init__(self, stages: List[Stage], on_error: Callable = None, output_queue_size: int = 64,
+                 stop_event: threading.Event = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.on_error = on_error
+        self.output_queue_size = output_queue_size
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._stop_event = stop_event
+        self._started_at = None
+        self._finished_at = None
+
+    def _stopped(self) -> bool:
+        return self._cancelled.is_set() or (self._stop_event is not None and self._stop_event.is_set())
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        while not self._stopped():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stopped():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _report_error(self, stage_name: str, item, error: Exception):
+        if not self.on_error:
+            return
+        try:
+            self.on_error(stage_name, item, error)
+        except Exception:
+            # Uma falha no próprio on_error não pode derrubar a thread e travar o pipeline
+            traceback.print_exc()
+
+    def _feed(self, source: Iterable, target: queue.Queue, workers: int):
+        try:
+            for item in source:
+                if not self._put(target, item):
+                    return
+        except Exception as e:
+            self._report_error("source", None, e)
+        for _ in range(workers):
+            self._put(target, _DONE)
+
+    def _work(self, stage: Stage, source: queue.Queue, target: queue.Queue, finished: List[int], downstream: int):
+        try:
+            while True:
+                item = self._get(source)
+                if item is _DONE:
+                    break
+                start_time = time.time()
+                try:
+                    result = stage.fn(item)
+                except Exception as e:
+                    result = None
+                    with self._lock:
+                        stage.errors += 1
+                    self._report_error(stage.name, item, e)
+                with self._lock:
+                    stage.busy_seconds += time.time() - start_time
+                    stage.processed += 1
+                    if result is None:
+                        stage.dropped += 1
+                if result is not None and not self._put(target, result):
+                    return
+        finally:
+            # O último worker do estágio avisa o estágio seguinte, mesmo se esta thread falhar
+            with self._lock:
+                finished[0] += 1
+                last = finished[0] == stage.workers
+            if last:
+                for _ in range(downstream):
+                    self._put(target, _DONE)
+
+    def run(self, source: Iterable) -> Iterator:
+        """Feeds the source through every stage and yields the results of the last one as they complete"""
+        self._started_at = time.time()
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=self.output_queue_size))
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0], self.stages[0].workers),
+                                    name="pipeline-source", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            downstream = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            finished = [0]
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, queues[i], queues[i + 1], finished, downstream),
+                    name=f"pipeline-{stage.name}-{n}", daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Se o consumidor parou antes do fim, libera as threads bloqueadas nas filas
+            self._cancelled.set()
+            for thread in threads:
+                thread.join()
+            self._finished_at = time.time()
+
+    def cancel(self):
+        """Stops every stage; run() returns after the items in progress"""
+        self._cancelled.set()
+
+    def stats(self) -> Dict:
+        """Items processed, dropped, errors, busy time and utilization per stage"""
+        end = self._finished_at or time.time()
+        elapsed = max(end - (self._started_at or end), 1e-9)
+        with self._lock:
+            return {
+                stage.name: {
+                    "processed": stage.processed,
+                    "dropped": stage.dropped,
+                    "errors": stage.errors,
+                    "busy_seconds": stage.busy_seconds,
+                    "utilization": stage.busy_seconds / (elapsed * stage.workers)
+                }
+                for stage in self.stages
+            }
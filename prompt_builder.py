@@ -0,0 +1,216 @@
+import os
+import ast
+import textwrap
+from typing import Dict, List
+
+# Orçamento padrão (em tokens estimados) dos trechos de código de cada prompt
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Abaixo disso não vale a pena incluir um corpo de função truncado
+_MIN_BODY_TOKENS = 64
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for code and English)"""
+    return len(text) // 4 + 1
+
+def _signature(node, prefix: str = "") -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        return f"{prefix}class {node.name}({bases}):" if bases else f"{prefix}class {node.name}:"
+    keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix}{keyword} {node.name}({ast.unparse(node.args)}){returns}:"
+
+def _first_paragraph(docstring: str) -> str:
+    return " ".join(docstring.strip().split("\n\n")[0].split())
+
+def _collect_definitions(tree: ast.Module) -> List[Dict]:
+    """Top-level classes and functions plus methods, in source order"""
+    definitions = []
+    function_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            definitions.append({"node": node, "qualname": node.name, "prefix": ""})
+            for child in node.body:
+                if isinstance(child, function_types):
+                    definitions.append({"node": child, "qualname": f"{node.name}.{child.name}", "prefix": "    "})
+        elif isinstance(node, function_types):
+            definitions.append({"node": node, "qualname": node.name, "prefix": ""})
+    return definitions
+
+def _take_lines(text: str, budget: int) -> str:
+    """Keeps whole lines of text while they fit in the budget"""
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+def _body_source(code: str, definition: Dict, show_signature: bool, show_docstring: bool) -> str:
+    """Source of a function, without the signature and docstring already shown in earlier sections"""
+    node = definition["node"]
+    body = node.body
+    if not show_docstring and ast.get_docstring(node) is not None:
+        body = body[1:]
+    if not body:
+        return ""
+    if show_signature or body[0].lineno <= node.lineno:
+        source = ast.get_source_segment(code, node, padded=True)
+        return textwrap.dedent(source) if source else ""
+    lines = code.splitlines()[body[0].lineno - 1:node.end_lineno]
+    return textwrap.dedent("\n".join(lines))
+
+def build_code_excerpt(file_path: str, token_budget: int = DEFAULT_TOKEN_BUDGET, code: str = None) -> str:
+    """
+    Packs the most informative parts of a file into token_budget estimated tokens.
+    Priority: module docstring, signatures, docstrings, then the bodies of the
+    most complex functions (by number of AST nodes, as in analyze_file).
+    Section headers and separators count against the budget too.
+    """
+    if code is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            code = f.read()
+    tree = ast.parse(code)
+    definitions = _collect_definitions(tree)
+    remaining = token_budget
+    sections = []
+
+    def take(text: str) -> bool:
+        nonlocal remaining
+        cost = estimate_tokens(text + "\n")
+        if cost > remaining:
+            return False
+        remaining -= cost
+        return True
+
+    def give_back(text: str):
+        nonlocal remaining
+        remaining += estimate_tokens(text + "\n")
+
+    def open_section(header: str) -> str:
+        # O separador "\n\n" entre seções é cobrado junto com o cabeçalho
+        header = ("\n" + header) if sections else header
+        return header if take(header) else None
+
+    module_doc = ast.get_docstring(tree)
+    if module_doc and open_section(f"Module docstring: {_first_paragraph(module_doc)}"):
+        sections.append(f"Module docstring: {_first_paragraph(module_doc)}")
+
+    signatures = []
+    header = open_section("Signatures:")
+    if header:
+        for definition in definitions:
+            line = _signature(definition["node"], definition["prefix"])
+            if not take(line):
+                break
+            signatures.append(line)
+            definition["signature_shown"] = True
+        if signatures:
+            sections.append("Signatures:\n" + "\n".join(signatures))
+        else:
+            give_back(header)
+
+    docstrings = []
+    header = open_section("Docstrings:")
+    if header:
+        for definition in definitions:
+            doc = ast.get_docstring(definition["node"])
+            if doc:
+                line = f"{definition['qualname']}: {_first_paragraph(doc)}"
+                if not take(line):
+                    break
+                docstrings.append(line)
+                definition["docstring_shown"] = True
+        if docstrings:
+            sections.append("Docstrings:\n" + "\n".join(docstrings))
+        else:
+            give_back(header)
+
+    bodies = []
+    header = open_section("Most complex functions:\n```python")
+    # A cerca de fechamento é reservada antes dos corpos
+    if header and take("```"):
+        ranked = sorted(
+            (d for d in definitions if not isinstance(d["node"], ast.ClassDef)),
+            key=lambda d: len(list(ast.walk(d["node"]))),
+            reverse=True
+        )
+        for definition in ranked:
+            source = _body_source(code, definition, not definition.get("signature_shown"),
+                                  not definition.get("docstring_shown"))
+            if not source.strip():
+                continue
+            # A linha em branco entre corpos é cobrada com o bloco
+            block = f"# {definition['qualname']}\n{source}"
+            if take(("\n" if bodies else "") + block):
+                bodies.append(block)
+            elif remaining >= _MIN_BODY_TOKENS:
+                # O corpo mais complexo que não cabe inteiro entra truncado e encerra a seleção
+                truncated = _take_lines(block, remaining - estimate_tokens("\n    ...\n") - 1)
+                remaining = 0
+                bodies.append(truncated + "\n    ...")
+                break
+        if bodies:
+            sections.append("Most complex functions:\n```python\n" + "\n\n".join(bodies) + "\n```")
+        else:
+            give_back("```")
+            give_back(header)
+    elif header:
+        give_back(header)
+
+    return "\n\n".join(sections)
+
+# Nomes listados na estrutura do arquivo antes de resumir como "+N more"
+_MAX_LISTED_NAMES = 30
+
+def _name_list(names: List[str]) -> str:
+    if not names:
+        return "Nenhuma"
+    listed = ", ".join(names[:_MAX_LISTED_NAMES])
+    if len(names) > _MAX_LISTED_NAMES:
+        listed += f" (+{len(names) - _MAX_LISTED_NAMES} more)"
+    return listed
+
+def describe_structure(file_info: Dict) -> str:
+    """Short structure summary from analyze_file output"""
+    structure = f"Classes: {_name_list([cls['name'] for cls in file_info.get('classes', [])])}\n"
+    structure += f"Functions: {_name_list([func['name'] for func in file_info.get('functions', [])])}\n"
+    structure += f"Imports: {len(file_info.get('imports', []))}, complexity: {file_info.get('complexity', 0)}, "
+    structure += f"lines: {file_info.get('lines', 0)}\n"
+    return structure
+
+def _excerpt_or_note(file_path: str, token_budget: int) -> str:
+    try:
+        return build_code_excerpt(file_path, token_budget)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return f"(source unavailable: {e})"
+
+def build_file_summary_prompt(file_info: Dict, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Prompt for the per-file summary in generate_documentation"""
+    prompt = f"Analyze the file {file_info['file']} and explain its purpose and key components:\n"
+    prompt += describe_structure(file_info)
+    prompt += f"\nSource excerpts:\n{_excerpt_or_note(file_info['file'], token_budget)}\n"
+    return prompt
+
+def build_file_report_prompt(file_path: str, file_info: Dict, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Prompt for the search-oriented per-file report"""
+    return f"""
+        Extract the most relevant information from the file {os.path.basename(file_path)} ({file_path}) and generate a concise and informative text describing its content.
+        The generated text should be optimized for semantic search using embeddings.
+
+        Desired output example:
+
+        Main topics: climate change, agriculture, environmental impact, food security, data analysis, statistical modeling.
+        Content: This scientific study investigates the effects of climate change on global agricultural production.
+        By analyzing historical data and future projections, the document demonstrates how extreme climate events,
+        such as droughts and floods, affect agricultural productivity and food availability.
+        The authors propose adaptation and mitigation measures to ensure food security in a global warming scenario.
+
+File structure:
+{describe_structure(file_info)}
+Source excerpts:
+{_excerpt_or_note(file_path, token_budget)}
+"""
@@ -0,0 +1,151 @@
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+# Classes de prioridade: número menor é atendido primeiro
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+# Tempos de espera guardados por classe para as estatísticas (avg/max/p95)
+_WAIT_SAMPLES = 1000
+
+class RequestScheduler:
+    """
+    Escalonador das chamadas ao backend (chat e embeddings) com duas classes de prioridade.
+    Pedidos interativos passam à frente de todos os pedidos batch na fila, e
+    reserved_interactive workers ficam livres de trabalho batch, para que um pedido
+    interativo não espere uma chamada batch longa terminar. O batch usa o restante.
+    Com max_pending_batch pedidos batch na fila, submit() batch bloqueia (backpressure);
+    pedidos interativos nunca bloqueiam.
+    """
+    def __init__(self, max_concurrency: int = 3, reserved_interactive: int = 1, max_pending_batch: int = 64):
+        if not 0 <= reserved_interactive < max_concurrency:
+            raise ValueError("reserved_interactive must leave at least one worker for batch requests")
+        self.max_concurrency = max_concurrency
+        self.reserved_interactive = reserved_interactive
+        self.max_pending_batch = max_pending_batch
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._started_at = time.time()
+        self._stats = {
+            name: {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "pending": 0, "running": 0,
+                   "busy_seconds": 0.0}
+            for name in PRIORITIES
+        }
+        self._waits = {name: deque(maxlen=_WAIT_SAMPLES) for name in PRIORITIES}
+        self._max_wait = {name: 0.0 for name in PRIORITIES}
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"scheduler-worker-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn: Callable, *args, priority: str = BATCH) -> Future:
+        """Queues fn(*args) in the given priority class and returns a Future with its result"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {list(PRIORITIES)}")
+        future = Future()
+        with self._condition:
+            while (priority == BATCH and not self._closed
+                   and self._stats[BATCH]["pending"] >= self.max_pending_batch):
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            stats = self._stats[priority]
+            stats["submitted"] += 1
+            stats["pending"] += 1
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._sequence), time.time(),
+                                        priority, future, fn, args))
+            self._condition.notify_all()
+        return future
+
+    def _can_start(self) -> bool:
+        if not self._heap:
+            return False
+        if self._heap[0][3] == INTERACTIVE:
+            return True
+        return self._stats[BATCH]["running"] < self.max_concurrency - self.reserved_interactive
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._can_start() and not (self._closed and not self._heap):
+                    self._condition.wait()
+                if not self._heap:
+                    return
+                _, _, enqueued_at, priority, future, fn, args = heapq.heappop(self._heap)
+                stats = self._stats[priority]
+                stats["pending"] -= 1
+                # Libera um produtor batch que esperava espaço na fila
+                self._condition.notify_all()
+                if not future.set_running_or_notify_cancel():
+                    stats["cancelled"] += 1
+                    continue
+                start_time = time.time()
+                wait = start_time - enqueued_at
+                self._waits[priority].append(wait)
+                self._max_wait[priority] = max(self._max_wait[priority], wait)
+                stats["running"] += 1
+
+            try:
+                future.set_result(fn(*args))
+                outcome = "completed"
+            except Exception as e:
+                future.set_exception(e)
+                outcome = "failed"
+
+            with self._condition:
+                stats[outcome] += 1
+                stats["running"] -= 1
+                stats["busy_seconds"] += time.time() - start_time
+                self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Per priority class: queue depth, running and finished requests, and wait times in seconds"""
+        elapsed = max(time.time() - self._started_at, 1e-9)
+        with self._condition:
+            result = {}
+            for name in PRIORITIES:
+                stats = dict(self._stats[name])
+                waits = sorted(self._waits[name])
+                stats["wait_avg"] = sum(waits) / len(waits) if waits else 0.0
+                stats["wait_p95"] = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+                stats["wait_max"] = self._max_wait[name]
+                stats["requests_per_second"] = stats["completed"] / elapsed
+                result[name] = stats
+            busy_seconds = sum(stats["busy_seconds"] for stats in self._stats.values())
+        result["utilization"] = busy_seconds / (elapsed * self.max_concurrency)
+        return result
+
+    def report_lines(self) -> List[str]:
+        """Human-readable queue depth and wait times per priority class"""
+        stats = self.stats()
+        return [
+            f"{name:<11} pending={stats[name]['pending']} running={stats[name]['running']} "
+            f"completed={stats[name]['completed']} failed={stats[name]['failed']} "
+            f"wait avg={stats[name]['wait_avg']:.2f}s p95={stats[name]['wait_p95']:.2f}s "
+            f"max={stats[name]['wait_max']:.2f}s"
+            for name in PRIORITIES
+        ]
+
+    def close(self):
+        """Stops the workers after the queued requests are served"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List
+
+JOURNAL_NAME = "run_journal.jsonl"
+
+def results_key(analysis_results: List[Dict]) -> str:
+    """Identifies a set of analyze_file results; project-wide records are only reused for the same set"""
+    content = json.dumps(sorted(analysis_results, key=lambda result: result["file"]), sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _repair_tail(path: str):
+    """Makes the journal end with a newline, cutting a last line torn by a crash"""
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        end = 0
+        while position > 0:
+            start = max(0, position - 64 * 1024)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            position = start
+        if end == size:
+            return
+        f.seek(end)
+        tail = f.read()
+        try:
+            json.loads(tail)
+        except ValueError:
+            # Registro incompleto: load() já o ignora, e o próximo não pode ser colado nele
+            f.truncate(end)
+            return
+        f.write(b"\n")
+
+class RunJournal:
+    """
+    Diário append-only (JSON Lines) dos resultados já concluídos de uma execução.
+    Cada registro é gravado e enviado ao sistema operacional na hora; o fsync
+    acontece a cada fsync_every registros ou fsync_interval segundos.
+    Com resume=True os registros existentes são recarregados para pular trabalho feito.
+    """
+    def __init__(self, path: str, resume: bool = False, fsync_every: int = 20, fsync_interval: float = 2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.time()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if resume and os.path.exists(path):
+            self.entries = self.load(path)
+            _repair_tail(path)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Dict[str, object]]:
+        """Reads a journal, ignoring a last line cut short by a crash"""
+        entries: Dict[str, Dict[str, object]] = {}
+        if not os.path.exists(path):
+            return entries
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries.setdefault(record["kind"], {})[record["key"]] = record["data"]
+        return entries
+
+    def get(self, kind: str, key: str = ""):
+        """Returns a recorded result, or None"""
+        with self._lock:
+            return self.entries.get(kind, {}).get(key)
+
+    def record(self, kind: str, key: str, data):
+        """Appends a completed result to the journal"""
+        line = json.dumps({"kind": kind, "key": key, "data": data, "time": time.time()})
+        with self._lock:
+            self.entries.setdefault(kind, {})[key] = data
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def sync(self):
+        """Forces the journal to disk"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync_locked()
+
+    def analysis_for(self, file_path: str):
+        """Recorded analyze_file result, if the file has not changed since it was recorded"""
+        entry = self.get("analysis", file_path)
+        if entry is None:
+            return None
+        try:
+            if os.stat(file_path).st_mtime_ns != entry["mtime_ns"]:
+                return None
+        except OSError:
+            return None
+        return entry["result"]
+
+    def record_analysis(self, file_path: str, result: Dict):
+        """Records an analyze_file result with the file's modification time"""
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return
+        self.record("analysis", file_path, {"mtime_ns": mtime_ns, "result": result})
+
+    def summary_for(self, file_path: str):
+        """Recorded summary, if the file has not changed since the analysis it was made from"""
+        entry = self.get("summary", file_path)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            if os.stat(file_path).st_mtime_ns != entry["mtime_ns"]:
+                return None
+        except OSError:
+            return None
+        return entry["summary"]
+
+    def record_summary(self, file_path: str, summary: str):
+        """Records a summary with the modification time of the analysis it was made from"""
+        analysis = self.get("analysis", file_path)
+        if analysis is not None:
+            mtime_ns = analysis["mtime_ns"]
+        else:
+            try:
+                mtime_ns = os.stat(file_path).st_mtime_ns
+            except OSError:
+                return
+        self.record("summary", file_path, {"mtime_ns": mtime_ns, "summary": summary})
+
+    def close(self):
+        """Syncs and closes the journal"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync_locked()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,159 @@
+import os
+import json
+import html
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import markdown
+
+# Muda quando o template HTML muda, para forçar a regravação de todas as páginas
+SITE_TEMPLATE_VERSION = "1"
+
+MANIFEST_NAME = "site_manifest.json"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }}
+        nav {{ border-bottom: 1px solid #ccc; padding-bottom: 8px; margin-bottom: 16px; }}
+        nav a {{ margin-right: 12px; }}
+    </style>
+</head>
+<body>
+    <nav>{nav}</nav>
+    {body}
+</body>
+</html>
+"""
+
+def _render_page(page: Dict) -> str:
+    """Converts one page to HTML (runs in a worker process)"""
+    return PAGE_TEMPLATE.format(title=html.escape(page["title"]), nav=page["nav"],
+                                body=markdown.markdown(page["markdown"]))
+
+def _page_hash(page: Dict) -> str:
+    content = json.dumps([SITE_TEMPLATE_VERSION, page["title"], page["nav"], page["markdown"]])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def module_page_names(file_paths: List[str]) -> Dict[str, str]:
+    """Maps each source file to its page name, based on its path relative to the project root"""
+    if not file_paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in file_paths])
+    names = {}
+    for path in file_paths:
+        relative = os.path.relpath(os.path.abspath(path), root)
+        names[path] = "modules/" + os.path.splitext(relative)[0].replace(os.sep, ".") + ".html"
+    return names
+
+def _link(from_page: str, to_page: str, text: str) -> str:
+    href = os.path.relpath(to_page, os.path.dirname(from_page) or ".").replace(os.sep, "/")
+    return f'<a href="{html.escape(href)}">{html.escape(text)}</a>'
+
+def build_site_pages(documentation: Dict) -> Dict[str, Dict]:
+    """Builds the markdown of every page: index, module list and one page per module"""
+    file_summaries = documentation["file_summaries"]
+    page_names = module_page_names(list(file_summaries))
+    ordered = sorted(file_summaries, key=lambda path: page_names[path])
+    pages = {}
+
+    def nav(page_name: str, previous: str = None, following: str = None) -> str:
+        links = [_link(page_name, "index.html", "Overview"), _link(page_name, "modules.html", "Modules")]
+        if previous:
+            links.append(_link(page_name, page_names[previous], "← " + os.path.basename(previous)))
+        if following:
+            links.append(_link(page_name, page_names[following], os.path.basename(following) + " →"))
+        return " ".join(links)
+
+    pages["index.html"] = {
+        "title": "Project Documentation",
+        "nav": nav("index.html"),
+        "markdown": f"""# Project Documentation
+
+## Project Overview
+{documentation['project_overview']}
+
+## Module Interactions
+{documentation['module_interactions']}
+
+[Browse {len(ordered)} modules](modules.html)
+"""
+    }
+
+    module_list = "# Modules\n"
+    current_dir = None
+    for path in ordered:
+        directory = page_names[path][len("modules/"):-len(".html")].rpartition(".")[0]
+        if directory != current_dir:
+            module_list += f"\n## {directory or '.'}\n"
+            current_dir = directory
+        module_list += f"- [{os.path.basename(path)}]({page_names[path]})\n"
+    pages["modules.html"] = {"title": "Modules", "nav": nav("modules.html"), "markdown": module_list}
+
+    for i, path in enumerate(ordered):
+        file_info = file_summaries[path]
+        details = file_info["details"]
+        page_name = page_names[path]
+        pages[page_name] = {
+            "title": os.path.basename(path),
+            "nav": nav(page_name, ordered[i - 1] if i > 0 else None,
+                       ordered[i + 1] if i + 1 < len(ordered) else None),
+            "markdown": f"""# {path}
+{file_info['summary']}
+
+## Detailed Components
+- **Classes**: {', '.join([cls['name'] for cls in details['classes']])}
+- **Functions**: {', '.join([func['name'] for func in details['functions']])}
+- **Complexity**: {details.get('complexity', 0)}, **Lines**: {details.get('lines', 0)}
+"""
+        }
+    return pages
+
+def save_documentation_site(documentation: Dict, output_dir: str, workers: int = None) -> Dict:
+    """
+    Writes the documentation as a multi-page HTML site.
+    Pages are rendered in parallel and, on re-runs, only pages whose
+    content hash changed are rewritten. Returns page counters.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    pages = build_site_pages(documentation)
+    hashes = {name: _page_hash(page) for name, page in pages.items()}
+    changed = [
+        name for name in pages
+        if previous.get(name) != hashes[name] or not os.path.exists(os.path.join(output_dir, name))
+    ]
+
+    if changed:
+        if len(changed) == 1 or workers == 1:
+            rendered = [_render_page(pages[name]) for name in changed]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = list(executor.map(_render_page, [pages[name] for name in changed],
+                                             chunksize=max(1, len(changed) // 64)))
+        for name, content in zip(changed, rendered):
+            path = os.path.join(output_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+    # Remove páginas de módulos que não existem mais
+    removed = 0
+    for name in set(previous) - set(pages):
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2)
+    return {"pages": len(pages), "written": len(changed), "unchanged": len(pages) - len(changed),
+            "removed": removed}
@@ -0,0 +1,102 @@
+"""
+Servidores falsos compatíveis com a API do Ollama (e com a rota /v1 do OpenAI)
+para testar localmente o balanceamento entre vários hosts sem GPU.
+
+    python stand_in_ollama.py --ports 11435 11436 11437 --latency 0.5
+    OLLAMA_HOSTS=http://localhost:11435,http://localhost:11436,http://localhost:11437 python batch_cli.py ...
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+def fake_embedding(text: str, size: int = 64):
+    """Deterministic pseudo-embedding derived from the text hash"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    return [rng.uniform(-1, 1) for _ in range(size)]
+
+def make_handler(port: int, latency: float, jitter: float, fail_rate: float):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._send({"models": [{"name": "stand-in"}]})
+            elif self.path == "/v1/models":
+                self._send({"object": "list", "data": [{"id": "stand-in", "object": "model"}]})
+            elif self.path == "/":
+                self._send("Ollama is running")
+            else:
+                self._send({"error": "not found"}, 404)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < fail_rate:
+                self._send({"error": "stand-in failure"}, 500)
+                return
+
+            if self.path in ("/api/chat", "/v1/chat/completions"):
+                prompt = request.get("messages", [{}])[-1].get("content", "")
+                content = f"[stand-in :{port}] reply to a {len(prompt)} character prompt"
+                if self.path == "/api/chat":
+                    self._send({"model": request.get("model"), "created_at": "1970-01-01T00:00:00Z",
+                                "message": {"role": "assistant", "content": content}, "done": True})
+                else:
+                    self._send({"id": "stand-in", "object": "chat.completion", "created": int(time.time()),
+                                "model": request.get("model"),
+                                "choices": [{"index": 0, "finish_reason": "stop",
+                                             "message": {"role": "assistant", "content": content}}]})
+            elif self.path == "/api/embeddings":
+                self._send({"embedding": fake_embedding(request.get("prompt", ""))})
+            elif self.path == "/api/embed":
+                inputs = request.get("input", "")
+                inputs = inputs if isinstance(inputs, list) else [inputs]
+                self._send({"model": request.get("model"), "embeddings": [fake_embedding(text) for text in inputs]})
+            else:
+                self._send({"error": "not found"}, 404)
+
+    return StandInHandler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run stand-in Ollama servers for local load balancing tests")
+    parser.add_argument("--ports", type=int, nargs="+", default=[11435, 11436])
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.2],
+                        help="Response latency in seconds, one value for all ports or one per port")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    servers = []
+    for i, port in enumerate(args.ports):
+        latency = args.latency[i] if i < len(args.latency) else args.latency[-1]
+        server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(port, latency, args.jitter, args.fail_rate))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        print(f"Stand-in Ollama listening on http://localhost:{port} (latency {latency:.2f}s)")
+
+    print("OLLAMA_HOSTS=" + ",".join(f"http://localhost:{port}" for port in args.ports))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+import threading
+from typing import Dict, Set
+from embedding_store import STORAGE_MODES, embedding_path, save_embedding
+from lexical_index import BM25Index, build_search_text
+from model_routing import ModelRouter
+from main_functions import (
+    analyze_file,
+    generate_file_report,
+    llm_embeddings,
+    lexical_index_path,
+    report_file_name,
+    log_info,
+    log_warning,
+    log_error,
+    log_success
+)
+
+# Pastas geradas pela própria ferramenta ou irrelevantes para a documentação
+IGNORED_DIRS = {"_relatorios", "project_docs", "chroma_storage", "__pycache__", "node_modules"}
+
+def _is_ignored_dir(name: str) -> bool:
+    return name in IGNORED_DIRS or name.startswith(".")
+
+def _is_watched_file(path: str) -> bool:
+    return path.endswith(".py") and not os.path.basename(path).startswith(".")
+
+def _walk_project(project_dir: str):
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if not _is_ignored_dir(d)]
+        yield root, files
+
+# Constantes de inotify(7)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """Recursive watcher based on Linux inotify (via ctypes, no extra dependency)"""
+    def __init__(self, project_dir: str):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.project_dir = project_dir
+        self._watches: Dict[int, str] = {}
+        for root, _ in _walk_project(project_dir):
+            self._add_watch(root)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            log_warning(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._watches[wd] = directory
+
+    def _remove_watches(self, directory: str):
+        prefix = directory + os.sep
+        for wd, watched in list(self._watches.items()):
+            if watched == directory or watched.startswith(prefix):
+                # Pode já ter sido removido pelo kernel (pasta apagada); o erro é ignorado
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Waits up to timeout seconds and returns the paths touched since the last call
+
+        Besides .py files, a directory path may be returned: it was moved away or
+        deleted (everything indexed under it is gone), or it needs a full rescan.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Eventos foram perdidos: o projeto inteiro é reconciliado
+                log_warning("inotify event queue overflowed, rescanning the project")
+                changed.add(self.project_dir)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_IGNORED:
+                del self._watches[wd]
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                # Pasta nova (criada ou movida para dentro): passa a ser observada
+                # e seus arquivos entram no lote, pois chegaram sem eventos próprios
+                if _is_ignored_dir(name):
+                    continue
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    for root, files in _walk_project(path):
+                        self._add_watch(root)
+                        changed.update(os.path.join(root, f) for f in files if _is_watched_file(f))
+                elif mask & (_IN_MOVED_FROM | _IN_DELETE):
+                    # Pasta movida para fora ou apagada: seus arquivos saem sem eventos próprios
+                    self._remove_watches(path)
+                    changed.add(path)
+            elif name and _is_watched_file(name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    """Fallback watcher comparing modification times every interval seconds"""
+    def __init__(self, project_dir: str, interval: float = 1.0):
+        self.project_dir = project_dir
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for root, files in _walk_project(self.project_dir):
+            for file in files:
+                if _is_watched_file(file):
+                    path = os.path.join(root, file)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Waits up to timeout seconds and returns the .py paths that changed"""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {path for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        changed |= set(self._snapshot) - set(snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+def create_watcher(project_dir: str, polling: bool = False, interval: float = 1.0):
+    """Returns an inotify watcher, or the polling one if requested or inotify is unavailable"""
+    if not polling:
+        try:
+            watcher = InotifyWatcher(project_dir)
+            log_info(f"Watching {project_dir} with inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            log_warning(f"inotify unavailable ({e}), falling back to polling")
+    log_info(f"Watching {project_dir} by polling every {interval:.1f}s")
+    return PollingWatcher(project_dir, interval)
+
+class ProjectUpdater:
+    """
+    Atualiza análise, relatório, embedding e índices somente dos arquivos alterados.
+    """
+    def __init__(self, project_dir: str, router: ModelRouter = None, storage: str = "float32",
+                 searcher=None):
+        self.project_dir = project_dir
+        self.reports_dir = os.path.join(project_dir, "_relatorios")
+        self.router = router
+        self.storage = storage
+        self.searcher = searcher
+        self.lexical_index = BM25Index.load(lexical_index_path(project_dir))
+
+    def _report_path(self, file_path: str) -> str:
+        return os.path.join(self.reports_dir, report_file_name(self.project_dir, file_path))
+
+    def _indexed_under(self, directory: str) -> Set[str]:
+        prefix = directory.rstrip(os.sep) + os.sep
+        return {doc_id for doc_id in self.lexical_index.doc_ids() if doc_id.startswith(prefix)}
+
+    def _is_stale(self, file_path: str) -> bool:
+        report_path = self._report_path(file_path)
+        if file_path not in self.lexical_index or not os.path.exists(report_path):
+            return True
+        return os.path.getmtime(report_path) < os.path.getmtime(file_path)
+
+    def _expand(self, path: str) -> Set[str]:
+        """Files to refresh for one changed path; a directory stands for every file under it"""
+        if os.path.isdir(path):
+            present = {
+                os.path.join(root, file)
+                for root, files in _walk_project(path) for file in files if _is_watched_file(file)
+            }
+            # Reconciliação: só arquivos desatualizados e os que sumiram do disco
+            return {file for file in present if self._is_stale(file)} | (self._indexed_under(path) - present)
+        if os.path.exists(path):
+            return {path}
+        removed = {path} if _is_watched_file(path) else set()
+        return removed | self._indexed_under(path)
+
+    def _update_file(self, file_path: str):
+        file_result = analyze_file(file_path)
+        if not file_result:
+            return
+        report = generate_file_report(file_path, file_result, router=self.router)
+        os.makedirs(self.reports_dir, exist_ok=True)
+        with open(self._report_path(file_path), "w", encoding="utf-8") as f:
+            f.write(report)
+
+        # Um único embedding do relatório serve à busca por arquivos e ao ChromaDB
+        embedding = llm_embeddings(report)
+        save_embedding(file_path, embedding, self.storage)
+        if self.searcher is not None:
+            self.searcher.upsert_document(report_file_name(self.project_dir, file_path), report, embedding)
+        self.lexical_index.add_document(file_path, build_search_text(file_result, report))
+
+    def _remove_file(self, file_path: str):
+        for path in [self._report_path(file_path)] + [embedding_path(file_path, s) for s in STORAGE_MODES]:
+            if os.path.exists(path):
+                os.remove(path)
+        if self.searcher is not None:
+            self.searcher.delete_document(report_file_name(self.project_dir, file_path))
+        self.lexical_index.remove_document(file_path)
+
+    def update(self, paths: Set[str]):
+        """Refreshes every changed path, then saves the indexes once"""
+        start_time = time.time()
+        updated = 0
+        files = set()
+        for path in paths:
+            files |= self._expand(path)
+        for file_path in sorted(files):
+            try:
+                if os.path.isfile(file_path):
+                    self._update_file(file_path)
+                else:
+                    self._remove_file(file_path)
+                updated += 1
+            except Exception as e:
+                log_error(f"Error updating {file_path}: {e}")
+        self.lexical_index.save(lexical_index_path(self.project_dir))
+        if self.searcher is not None:
+            self.searcher.save_lexical_index()
+        log_success(f"Updated {updated}/{len(files)} files in {time.time() - start_time:.2f} seconds")
+
+def watch_project(project_dir: str, updater: ProjectUpdater, debounce: float = 0.5, max_batch_wait: float = 5.0,
+                  polling: bool = False, interval: float = 1.0, stop_event: threading.Event = None):
+    """
+    Watches the project and refreshes touched files. A burst of changes is
+    collected until debounce seconds pass without new events (or max_batch_wait
+    seconds in total) and then processed as one batch.
+    """
+    stop_event = stop_event or threading.Event()
+    watcher = create_watcher(project_dir, polling, interval)
+    try:
+        while not stop_event.is_set():
+            changed = watcher.changes(1.0)
+            if not changed:
+                continue
+            burst_start = time.time()
+            while time.time() - burst_start < max_batch_wait:
+                more = watcher.changes(debounce)
+                if not more:
+                    break
+                changed |= more
+            log_info(f"{len(changed)} changed files")
+            updater.update(changed)
+    finally:
+        watcher.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep reports, embeddings and search indexes fresh while files change")
+    parser.add_argument("project", help="Project root to watch")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet seconds that end a burst of changes")
+    parser.add_argument("--poll", action="store_true", help="Use polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="float32", help="Embedding storage format")
+    parser.add_argument("--no-chroma", action="store_true", help="Do not update the ChromaDB collection")
+    parser.add_argument("--no-routing", action="store_true", help="Use the large model for every report")
+    args = parser.parse_args(argv)
+
+    searcher = None
+    if not args.no_chroma:
+        from extract_embedding import SemanticSearchChroma
+        searcher = SemanticSearchChroma()
+    updater = ProjectUpdater(args.project, None if args.no_routing else ModelRouter(), args.storage, searcher)
+    try:
+        watch_project(args.project, updater, args.debounce, polling=args.poll, interval=args.interval)
+    except KeyboardInterrupt:
+        log_info("Watch mode stopped")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())